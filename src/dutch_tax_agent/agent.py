@@ -14,6 +14,7 @@ from dutch_tax_agent.config import settings
 from dutch_tax_agent.document_manager import DocumentManager
 from dutch_tax_agent.graph import create_tax_graph
 from dutch_tax_agent.ingestion import PDFParser, PIIScrubber
+from dutch_tax_agent.llm_factory import clear_response_cache
 from dutch_tax_agent.schemas.state import TaxGraphState, Replace
 
 # Suppress all Presidio logging BEFORE basicConfig to prevent any output
@@ -134,6 +135,9 @@ class DutchTaxAgent:
             if not pdf_paths:
                 console.print("[yellow]⚠️  No new documents found[/yellow]")
                 return state
+        else:
+            # A new thread starts a new session: drop responses cached for earlier ones
+            clear_response_cache()
 
         console.print(f"[bold]Processing {len(pdf_paths)} document(s)[/bold]\n")
 
@@ -346,6 +350,11 @@ class DutchTaxAgent:
 
         console.print(f"[green]✓[/green] Removed {len(removed_ids)} document(s)")
 
+        # Cached LLM responses hold the removed documents' figures; entries are keyed
+        # by prompt hash and cannot be traced back to a document, so all are dropped
+        if removed_ids:
+            clear_response_cache()
+
         # Also filter extraction_results and validated_results
         removed_ids_set = set(removed_ids)
 
@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     llm_model: str = Field(
         default="", alias="LLM_MODEL"
     )  # Empty means use provider-specific default
+    parser_model: str = Field(
+        default="", alias="PARSER_MODEL"
+    )  # Model for the document parser agents; empty means use LLM_MODEL
     ollama_base_url: str = Field(
         default="http://localhost:11434", alias="OLLAMA_BASE_URL"
     )
@@ -77,6 +80,16 @@ class Settings(BaseSettings):
     # Document Processing
     enable_parallel_parsing: bool = Field(default=True, alias="ENABLE_PARALLEL_PARSING")
     max_parallel_docs: int = Field(default=10, alias="MAX_PARALLEL_DOCS")
+    trust_validated_items: bool = Field(
+        default=False,
+        alias="DUTCH_TAX_TRUST_VALIDATED",
+        description="Rebuild validator output in the aggregator without re-running Pydantic validation",
+    )
+    render_asset_tables: bool = Field(
+        default=True,
+        alias="DUTCH_TAX_RENDER_TABLES",
+        description="Print the Box 3 assets table during aggregation (disable for headless runs)",
+    )
 
     # Checkpointing Configuration
     enable_checkpointing: bool = Field(default=True, alias="ENABLE_CHECKPOINTING")
@@ -91,6 +104,18 @@ class Settings(BaseSettings):
         description="Path to SQLite checkpoint database (if using sqlite backend)"
     )
 
+    # LLM Response Cache Configuration (opt-in: responses hold extracted figures in plaintext)
+    enable_llm_cache: bool = Field(
+        default=False,
+        alias="ENABLE_LLM_CACHE",
+        description="Cache parser/classifier LLM responses on disk; cleared on new threads and document removal",
+    )
+    llm_cache_db_path: Path = Field(
+        default_factory=lambda: Path.home() / ".dutch_tax_agent" / "llm_cache.db",
+        alias="LLM_CACHE_DB_PATH",
+        description="Path to SQLite database caching deterministic parser/classifier LLM responses"
+    )
+
     # Paths
     project_root: Path = Field(default_factory=lambda: Path(__file__).parent.parent.parent)
     data_dir: Path = Field(default_factory=lambda: Path(__file__).parent / "data")
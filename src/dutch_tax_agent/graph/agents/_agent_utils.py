@@ -0,0 +1,181 @@
+"""Shared helpers for the parser agents."""
+
+import logging
+import re
+from collections import Counter
+
+import orjson
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.output_parsers import JsonOutputParser
+
+# Upper bound on the document text sent to a parser LLM
+MAX_DOC_CHARS = 16000
+
+logger = logging.getLogger(__name__)
+
+# User message carrying the variable part of a parser prompt
+USER_TEMPLATE = "Document:\n{doc_text}"
+
+# Page selection falls back to the full text if fewer characters than this survive
+MIN_SELECTED_CHARS = 500
+
+# Form feeds separate PDF pages in extracted text; "Page N of M" lines mark page ends
+_PAGE_SPLIT_RE = re.compile(
+    r"\f|^[ \t]*(?:page|pagina)\s+\d+\s+(?:of|van)\s+\d+[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Tolerates markdown fences and prose around the JSON object in LLM replies
+_JSON_PARSER = JsonOutputParser()
+
+# Lines repeated at least this often (and at least this long) are treated as
+# page headers/footers; short repeated lines such as "IBAN" or "0,00" are data
+_BOILERPLATE_MIN_REPEATS = 3
+_BOILERPLATE_MIN_CHARS = 20
+
+# Standalone page-number lines such as "Page 3 of 12" or "Pagina 3 van 12"
+_PAGE_NUMBER_RE = re.compile(
+    r"^(page|pagina)\s+\d+(\s+(of|van)\s+\d+)?$",
+    re.IGNORECASE,
+)
+
+
+def select_pages(
+    text: str, keywords_re: re.Pattern, min_chars: int = MIN_SELECTED_CHARS
+) -> str:
+    """Keep only the pages of a document that mention any of the given keywords.
+
+    Long statements are mostly transaction history; the balances the parsers
+    need sit on summary and position pages. The first page is always kept for
+    the account header. Falls back to the full text if the selection would be
+    too small to be trusted.
+
+    Args:
+        text: Document text, pages separated by form feeds or "Page N of M" lines
+        keywords_re: Compiled pattern matching pages worth keeping
+        min_chars: Minimum characters the selection must retain
+
+    Returns:
+        Text of the selected pages, or the full text
+    """
+    pages = [page for page in _PAGE_SPLIT_RE.split(text) if page.strip()]
+    if len(pages) <= 1:
+        return text
+
+    selected = [pages[0]] + [page for page in pages[1:] if keywords_re.search(page)]
+    selected_text = "\n\n".join(selected)
+    if len(selected_text.strip()) < min_chars:
+        return text
+
+    logger.info(
+        f"Selected {len(selected)}/{len(pages)} pages "
+        f"({len(selected_text)}/{len(text)} chars, "
+        f"{len(selected_text) / len(text):.0%} of original)"
+    )
+    return selected_text
+
+
+def compress_doc_text(text: str, max_chars: int = MAX_DOC_CHARS) -> str:
+    """Shrink document text before it is sent to the LLM.
+
+    Removes content that never carries tax data: blank lines, standalone page
+    numbers and repeated page headers/footers (kept once). If the result is
+    still longer than max_chars, a head and tail window is kept since statement
+    summaries appear on the first pages and year-end totals at the end.
+
+    Args:
+        text: Scrubbed document text
+        max_chars: Maximum number of characters to return
+
+    Returns:
+        Compressed document text
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    counts = Counter(lines)
+
+    seen_boilerplate = set()
+    kept_lines = []
+    for line in lines:
+        if not line or _PAGE_NUMBER_RE.match(line):
+            continue
+        if counts[line] >= _BOILERPLATE_MIN_REPEATS and len(line) >= _BOILERPLATE_MIN_CHARS:
+            if line in seen_boilerplate:
+                continue
+            seen_boilerplate.add(line)
+        kept_lines.append(line)
+
+    compressed = "\n".join(kept_lines)
+    if len(compressed) <= max_chars:
+        return compressed
+
+    head_chars = max_chars * 2 // 3
+    tail_chars = max_chars - head_chars
+    return f"{compressed[:head_chars]}\n[...]\n{compressed[-tail_chars:]}"
+
+
+def _error_result(doc_id: str, filename: str, err: object) -> dict:
+    """Build the state update returned when a parser agent fails on a document.
+
+    Args:
+        doc_id: Document ID
+        filename: Original filename
+        err: Exception or message describing the failure
+
+    Returns:
+        Dict with a single error entry for TaxGraphState.extraction_results
+    """
+    return {
+        "extraction_results": [
+            {
+                "doc_id": doc_id,
+                "source_filename": filename,
+                "status": "error",
+                "extracted_data": {},
+                "errors": [str(err)],
+                "warnings": [],
+            }
+        ]
+    }
+
+
+def build_messages(system_prompt: str, doc_text: str) -> list[BaseMessage]:
+    """Build the chat messages for a parser LLM call.
+
+    The static instructions go first as the system message and the document
+    last, so the long shared prefix stays byte-identical across calls and can
+    be served from the provider's prompt cache.
+
+    Args:
+        system_prompt: Static parser instructions and JSON schema
+        doc_text: Document text to extract from
+
+    Returns:
+        System and user messages for the LLM
+    """
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=USER_TEMPLATE.format(doc_text=doc_text)),
+    ]
+
+
+def parse_json_response(response_text: str) -> dict:
+    """Parse the JSON object out of a parser LLM reply.
+
+    Args:
+        response_text: Raw LLM response text
+
+    Returns:
+        Parsed JSON object
+
+    Raises:
+        OutputParserException: If the reply contains no valid JSON object
+    """
+    # JSON mode replies are bare JSON: decode them directly with orjson and only
+    # fall back to the fence/prose tolerant parser when that fails
+    try:
+        parsed = orjson.loads(response_text)
+    except orjson.JSONDecodeError:
+        return _JSON_PARSER.parse(response_text)
+    if not isinstance(parsed, dict):
+        return _JSON_PARSER.parse(response_text)
+    return parsed
@@ -1,45 +1,36 @@
 """Dutch bank statement parser agent."""
 
-import json
 import logging
 from datetime import date
+from types import MappingProxyType
 
-from langchain_core.messages import HumanMessage
+from langchain_core.exceptions import OutputParserException
 from langsmith import traceable
 
+from dutch_tax_agent.config import settings
+from dutch_tax_agent.graph.agents._agent_utils import (
+    _error_result,
+    build_messages,
+    parse_json_response,
+)
 from dutch_tax_agent.llm_factory import create_llm
 
 logger = logging.getLogger(__name__)
 
+# Defaults for Box 3 item fields the LLM may omit (reference_date is set per document)
+_BOX3_ITEM_DEFAULTS = MappingProxyType({
+    "dec31_reference_date": None,
+    "value_eur_jan1": None,
+    "value_eur_dec31": None,
+    "original_currency": "EUR",
+    # Default to 0.8 to match classification confidence default
+    "extraction_confidence": 0.8,
+    "account_number": None,
+})
 
-@traceable(name="Dutch Parser Agent")
-def dutch_parser_agent(input_data: dict) -> dict:
-    """Parse Dutch bank statements for Box 3 assets.
-    
-    Extracts:
-    - Savings account balances on Jan 1
-    - Investment account balances on Jan 1
-    - Realized gains/dividends (for actual return method)
-    
-    Args:
-        input_data: Dict with keys:
-            - doc_id: Document ID
-            - doc_text: Scrubbed document text
-            - filename: Original filename
-            - classification: Document classification info
-            
-    Returns:
-        Dict with extracted Box 3 asset data
-    """
-    doc_id = input_data["doc_id"]
-    doc_text = input_data["doc_text"]
-    filename = input_data["filename"]
-
-    logger.info(f"Dutch parser processing {filename}")
-
-    llm = create_llm(temperature=0)
 
-    prompt = f"""You are a specialized Dutch tax document parser. Extract Box 3 wealth data from this FULL YEAR bank statement.
+# System prompt for full-year Dutch bank statements
+_DUTCH_PROMPT = """You are a specialized Dutch tax document parser. Extract Box 3 wealth data from this FULL YEAR bank statement.
 
 CRITICAL: Dutch banks often have multiple account types that MUST be extracted as SEPARATE items:
 1. SAVINGS accounts (spaarrekening) - cash deposits, savings
@@ -99,17 +90,14 @@ IMPORTANT INSTRUCTIONS:
 - Example: "0,02" = 0.02 (two cents)
 - DO NOT confuse the format - always parse dots as thousands and commas as decimals
 
-Document:
-{doc_text}
-
 Return JSON in this EXACT format:
-{{
-  "document_date_range": {{
+{
+  "document_date_range": {
     "start_date": "YYYY-MM-DD" or null,
     "end_date": "YYYY-MM-DD" or null
-  }},
+  },
   "box3_items": [
-    {{
+    {
       "asset_type": "savings" or "checking" or "stocks" or "bonds" or "crypto" or "mortgage" or "debt" or "other",
       "value_eur_jan1": <number or null if not available>,
       "value_eur_dec31": <number or null if not available>,
@@ -120,9 +108,9 @@ Return JSON in this EXACT format:
       "account_number": "Account number or IBAN if available (e.g., 'NL12ABCD1234567890', '123456789') or null",
       "original_currency": "EUR",
       "extraction_confidence": <0.0 to 1.0>
-    }}
+    }
   ]
-}}
+}
 
 DATE MAPPING RULES:
 - If the statement shows BOTH 31-12-2023 AND 31-12-2024 in separate columns:
@@ -175,48 +163,33 @@ Example 4: Statement with IBAN and values on one line, account label on next lin
     * asset_type="checking", value_eur_jan1=15000.00, value_eur_dec31=12500.00, description="Personal account", account_number="IBAN"
     * asset_type="savings", value_eur_jan1=10000.00, value_eur_dec31=8500.50, description="Direct Savings", account_number="IBAN"
 
-If no Box 3 data is found, return: {{"box3_items": [], "document_date_range": {{"start_date": null, "end_date": null}}}}
+If no Box 3 data is found, return: {"box3_items": [], "document_date_range": {"start_date": null, "end_date": null}}
 """
 
-    try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        response_text = response.content.strip()
 
-        # Remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif response_text.startswith("```"):
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+def _process_response(input_data: dict, response_text: str) -> dict:
+    """Parse the LLM reply and fill missing item fields with defaults."""
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
 
-        # Parse JSON
-        extracted_data = json.loads(response_text)
+    try:
+        # Parse JSON, tolerating markdown fences and surrounding prose
+        extracted_data = parse_json_response(response_text)
 
         # Ensure document_date_range exists
         if "document_date_range" not in extracted_data:
             extracted_data["document_date_range"] = {"start_date": None, "end_date": None}
         
         # Add reference date and other missing fields if not present
+        # Infer missing reference dates from document_date_range or default to Jan 1
+        default_reference_date = (
+            extracted_data.get("document_date_range", {}).get("start_date")
+            or date(2024, 1, 1).isoformat()
+        )
         for item in extracted_data.get("box3_items", []):
-            if "reference_date" not in item:
-                # Try to infer from document_date_range or default to Jan 1
-                doc_start = extracted_data.get("document_date_range", {}).get("start_date")
-                if doc_start:
-                    item["reference_date"] = doc_start
-                else:
-                    item["reference_date"] = date(2024, 1, 1).isoformat()
-            if "dec31_reference_date" not in item:
-                item["dec31_reference_date"] = None
-            if "value_eur_jan1" not in item:
-                item["value_eur_jan1"] = None
-            if "value_eur_dec31" not in item:
-                item["value_eur_dec31"] = None
-            if "original_currency" not in item:
-                item["original_currency"] = "EUR"
-            if "extraction_confidence" not in item:
-                # Default to 0.8 to match classification confidence default
-                item["extraction_confidence"] = 0.8
-            if "account_number" not in item:
-                item["account_number"] = None
+            item.setdefault("reference_date", default_reference_date)
+            for key, value in _BOX3_ITEM_DEFAULTS.items():
+                item.setdefault(key, value)
 
         logger.info(
             f"Dutch parser extracted {len(extracted_data.get('box3_items', []))} items from {filename}"
@@ -236,33 +209,74 @@ If no Box 3 data is found, return: {{"box3_items": [], "document_date_range": {{
             ]
         }
 
-    except json.JSONDecodeError as e:
+    except OutputParserException as e:
         logger.error(f"Failed to parse JSON from Dutch parser for {filename}: {e}")
-        return {
-            "extraction_results": [
-                {
-                    "doc_id": doc_id,
-                    "source_filename": filename,
-                    "status": "error",
-                    "extracted_data": {},
-                    "errors": [f"JSON parsing error: {e}"],
-                    "warnings": [],
-                }
-            ]
-        }
+        return _error_result(doc_id, filename, f"JSON parsing error: {e}")
     except Exception as e:
         logger.error(f"Dutch parser failed for {filename}: {e}")
-        return {
-            "extraction_results": [
-                {
-                    "doc_id": doc_id,
-                    "source_filename": filename,
-                    "status": "error",
-                    "extracted_data": {},
-                    "errors": [str(e)],
-                    "warnings": [],
-                }
-            ]
-        }
+        return _error_result(doc_id, filename, e)
 
 
+@traceable(name="Dutch Parser Agent")
+def dutch_parser_agent(input_data: dict) -> dict:
+    """Parse Dutch bank statements for Box 3 assets.
+    
+    Extracts:
+    - Savings account balances on Jan 1
+    - Investment account balances on Jan 1
+    - Realized gains/dividends (for actual return method)
+    
+    Args:
+        input_data: Dict with keys:
+            - doc_id: Document ID
+            - doc_text: Scrubbed document text
+            - filename: Original filename
+            - classification: Document classification info
+            
+    Returns:
+        Dict with extracted Box 3 asset data
+    """
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
+
+    logger.info(f"Dutch parser processing {filename}")
+
+    llm = create_llm(
+        temperature=0, json_mode=True, use_cache=True, model=settings.parser_model
+    )
+
+    try:
+        response = llm.invoke(build_messages(_DUTCH_PROMPT, input_data["doc_text"]))
+    except Exception as e:
+        logger.error(f"Dutch parser failed for {filename}: {e}")
+        return _error_result(doc_id, filename, e)
+
+    return _process_response(input_data, response.content)
+
+
+@traceable(name="Dutch Parser Agent")
+async def dutch_parser_agent_async(input_data: dict) -> dict:
+    """Async variant of dutch_parser_agent, used when the graph runs via ainvoke.
+    
+    Args:
+        input_data: Dict with doc_id, doc_text, filename, classification
+            
+    Returns:
+        Dict with extracted Box 3 asset data
+    """
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
+
+    logger.info(f"Dutch parser processing {filename}")
+
+    llm = create_llm(
+        temperature=0, json_mode=True, use_cache=True, model=settings.parser_model
+    )
+
+    try:
+        response = await llm.ainvoke(build_messages(_DUTCH_PROMPT, input_data["doc_text"]))
+    except Exception as e:
+        logger.error(f"Dutch parser failed for {filename}: {e}")
+        return _error_result(doc_id, filename, e)
+
+    return _process_response(input_data, response.content)
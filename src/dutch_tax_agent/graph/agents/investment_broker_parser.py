@@ -1,20 +1,76 @@
 """Investment broker statement parser agent."""
 
-import json
 import logging
+import re
 from datetime import date
+from types import MappingProxyType
 
-from langchain_core.messages import HumanMessage
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import BaseMessage
 from langsmith import traceable
 
+from dutch_tax_agent.config import settings
+from dutch_tax_agent.graph.agents._agent_utils import (
+    _error_result,
+    build_messages,
+    compress_doc_text,
+    parse_json_response,
+    select_pages,
+)
 from dutch_tax_agent.llm_factory import create_llm
 
 logger = logging.getLogger(__name__)
 
-
-def _get_jan_period_prompt(doc_text: str) -> str:
-    """Generate prompt for January period statements."""
-    return f"""You are a specialized brokerage statement parser for Dutch tax purposes.
+# Fallback reference date when neither the item nor the document provides one
+_DEFAULT_JAN1 = date(2024, 1, 1).isoformat()
+
+# Documents shorter than this (after stripping) cannot hold a usable brokerage statement
+_MIN_DOC_CHARS = 200
+
+# At least one of these (English or Dutch) must appear before we spend an LLM call on the document
+_BROKER_KEYWORDS_RE = re.compile(
+    r"cash|portfolio|holdings|balance|position|ibkr|schwab|crypto"
+    r"|saldo|waarde|effecten|portefeuille|beleggingen|rekening|aandelen|positie|vermogen",
+    re.IGNORECASE,
+)
+
+# Pages mentioning any of these hold balances or positions; the rest is mostly
+# transaction history the prompts do not use
+_BROKER_PAGE_KEYWORDS_RE = re.compile(
+    r"dec(?:ember)? 31|jan(?:uary)? 1\b|31-12-|01-01-|-12-31|-01-01|12/31/|01/01/"
+    r"|opening balance|closing balance|ending balance|portfolio value|account summary"
+    r"|net asset value|realized|open positions|holdings|cash balance|total value",
+    re.IGNORECASE,
+)
+
+
+# Defaults for Box 3 item fields the LLM may omit (reference_date is set per document)
+_BOX3_ITEM_DEFAULTS = MappingProxyType({
+    # Default to USD for US brokers, but validator will handle currency conversion
+    "original_currency": "USD",
+    "dec31_reference_date": None,
+    "value_eur_jan1": None,
+    "value_eur_dec31": None,
+    # Default to 0.8 to match classification confidence default
+    "extraction_confidence": 0.8,
+    "account_number": None,
+})
+
+# Constant fields of the zero-valued accounts added when a statement lacks cash or investments
+_DEFAULT_CASH_ITEM = MappingProxyType({
+    "asset_type": "savings",
+    "realized_gains_eur": None,
+    "realized_losses_eur": None,
+    "extraction_confidence": 0.5,  # Lower confidence since it's inferred
+})
+_DEFAULT_INVESTMENT_ITEM = MappingProxyType({
+    **_DEFAULT_CASH_ITEM,
+    "asset_type": "stocks",  # Default to stocks for investment account
+})
+
+
+# System prompt for January period statements
+_JAN_PERIOD_PROMPT = """You are a specialized brokerage statement parser for Dutch tax purposes.
 
 Extract Box 3 wealth data from a JANUARY PERIOD brokerage statement.
 
@@ -86,17 +142,14 @@ Rules:
 - DO NOT use the 31-Dec value for value_eur_dec31 - that is WRONG
 - The field name "value_eur_jan1" means "value for the Jan 1 reference date", NOT "value on Jan 31"
 
-Document:
-{doc_text}
-
 Return JSON in this EXACT format:
-{{
-  "document_date_range": {{
+{
+  "document_date_range": {
     "start_date": "YYYY-MM-DD" or null,
     "end_date": "YYYY-MM-DD" or null
-  }},
+  },
   "box3_items": [
-    {{
+    {
       "asset_type": "savings" or "stocks" or "bonds" or "crypto" or "other",
       "value_eur_jan1": <value in original currency from 1-Jan if available, otherwise from 31-Dec of previous year, or null if only individual positions are shown>,
       "value_eur_dec31": null,
@@ -110,18 +163,18 @@ Return JSON in this EXACT format:
       "account_number": "Account number or identifier if available (e.g., '872', '123456789') or null",
       "extraction_confidence": <0.0 to 1.0>,
       "individual_positions": [
-        {{
+        {
           "symbol": "AAPL" or ticker symbol,
           "description": "Full name of the security (e.g., 'Apple Inc.')",
           "quantity": <number of shares (required)>,
           "price": <price per share in original currency (required)>,
           "currency": "USD" or "EUR" or other currency code,
           "date": "YYYY-MM-DD" (the date this price is for, e.g., "2024-01-01" or "2023-12-31")
-        }}
+        }
       ] or null (only include for investment accounts with individual positions shown)
-    }}
+    }
   ]
-}}
+}
 
 Examples:
 - If cash shows $5,000 on 1-Jan-2024 and $4,500 on 31-Dec-2023:
@@ -150,13 +203,12 @@ Examples:
   → CORRECT: Extract individual_positions array with quantity=10, price=150 for AAPL and quantity=5, price=240 for VTI, value_eur_jan1=null (no explicit total, validator will calculate quantity×price and sum)
   → WRONG: value_eur_jan1=2700 (DO NOT calculate by summing positions!)
 
-If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {{"box3_items": [], "document_date_range": {{"start_date": null, "end_date": null}}}}
+If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {"box3_items": [], "document_date_range": {"start_date": null, "end_date": null}}
 """
 
 
-def _get_dec_period_prompt(doc_text: str) -> str:
-    """Generate prompt for December period statements."""
-    return f"""You are a specialized brokerage statement parser for Dutch tax purposes.
+# System prompt for December period statements
+_DEC_PERIOD_PROMPT = """You are a specialized brokerage statement parser for Dutch tax purposes.
 
 Extract Box 3 wealth data from a DECEMBER PERIOD brokerage statement.
 
@@ -207,17 +259,14 @@ MANDATORY EXTRACTION RULE:
 - dec31_reference_date MUST be "2024-12-31" (the actual Dec 31 date shown)
 - DO NOT put the Dec 31 value into value_eur_jan1 - that is WRONG
 
-Document:
-{doc_text}
-
 Return JSON in this EXACT format:
-{{
-  "document_date_range": {{
+{
+  "document_date_range": {
     "start_date": "YYYY-MM-DD" or null,
     "end_date": "YYYY-MM-DD" or null
-  }},
+  },
   "box3_items": [
-    {{
+    {
       "asset_type": "savings" or "stocks" or "bonds" or "crypto" or "other",
       "value_eur_jan1": null,
       "value_eur_dec31": <value in original currency from 31-Dec of tax year, or null if only individual positions are shown>,
@@ -231,18 +280,18 @@ Return JSON in this EXACT format:
       "account_number": "Account number or identifier if available (e.g., '872', '123456789') or null",
       "extraction_confidence": <0.0 to 1.0>,
       "individual_positions": [
-        {{
+        {
           "symbol": "AAPL" or ticker symbol,
           "description": "Full name of the security (e.g., 'Apple Inc.')",
           "quantity": <number of shares (required)>,
           "price": <price per share in original currency (required)>,
           "currency": "USD" or "EUR" or other currency code,
           "date": "YYYY-MM-DD" (the date this price is for, e.g., "2024-12-31")
-        }}
+        }
       ] or null (only include for investment accounts with individual positions shown)
-    }}
+    }
   ]
-}}
+}
 
 Example: December 2024 statement showing:
 - Cash: $2,000 on 31-Dec-2024
@@ -266,13 +315,12 @@ Example: December 2024 statement showing:
   → CORRECT: Extract individual_positions array with quantity=10, price=150 for AAPL and quantity=5, price=240 for VTI, value_eur_dec31=null (no explicit total, validator will calculate quantity×price and sum)
   → WRONG: value_eur_dec31=2700 (DO NOT calculate by summing positions!)
 
-If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {{"box3_items": [], "document_date_range": {{"start_date": null, "end_date": null}}}}
+If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {"box3_items": [], "document_date_range": {"start_date": null, "end_date": null}}
 """
 
 
-def _get_dec_prev_year_prompt(doc_text: str) -> str:
-    """Generate prompt for December period statements of the previous year (used as Jan 1 value)."""
-    return f"""You are a specialized brokerage statement parser for Dutch tax purposes.
+# System prompt for previous-year December statements, used as Jan 1 value
+_DEC_PREV_YEAR_PROMPT = """You are a specialized brokerage statement parser for Dutch tax purposes.
 
 Extract Box 3 wealth data from a DECEMBER PERIOD STATEMENT OF THE PREVIOUS YEAR.
 
@@ -327,17 +375,14 @@ MANDATORY EXTRACTION RULE:
 - DO NOT put the Dec 31 value into value_eur_dec31 - that is WRONG
 - The field name "value_eur_jan1" means "value for the Jan 1 reference date", and this Dec 31 value is being used as a proxy for Jan 1
 
-Document:
-{doc_text}
-
 Return JSON in this EXACT format:
-{{
-  "document_date_range": {{
+{
+  "document_date_range": {
     "start_date": "YYYY-MM-DD" or null,
     "end_date": "YYYY-MM-DD" or null
-  }},
+  },
   "box3_items": [
-    {{
+    {
       "asset_type": "savings" or "stocks" or "bonds" or "crypto" or "other",
       "value_eur_jan1": <value in original currency from 31-Dec of previous year, or null if only individual positions are shown>,
       "value_eur_dec31": null,
@@ -351,18 +396,18 @@ Return JSON in this EXACT format:
       "account_number": "Account number or identifier if available (e.g., '872', '123456789') or null",
       "extraction_confidence": <0.0 to 1.0>,
       "individual_positions": [
-        {{
+        {
           "symbol": "AAPL" or ticker symbol,
           "description": "Full name of the security (e.g., 'Apple Inc.')",
           "quantity": <number of shares (required)>,
           "price": <price per share in original currency (required)>,
           "currency": "USD" or "EUR" or other currency code,
           "date": "YYYY-MM-DD" (the date this price is for, e.g., "2023-12-31")
-        }}
+        }
       ] or null (only include for investment accounts with individual positions shown)
-    }}
+    }
   ]
-}}
+}
 
 Example: December 2023 statement (for tax year 2024) showing:
 - Cash: $2,000 on 31-Dec-2023
@@ -386,13 +431,12 @@ Example: December 2023 statement (for tax year 2024) showing:
   → CORRECT: Extract individual_positions array with both positions, value_eur_jan1=null (no explicit total, validator will sum)
   → WRONG: value_eur_jan1=2700 (DO NOT calculate by summing positions!)
 
-If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {{"box3_items": [], "document_date_range": {{"start_date": null, "end_date": null}}}}
+If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {"box3_items": [], "document_date_range": {"start_date": null, "end_date": null}}
 """
 
 
-def _get_full_year_prompt(doc_text: str) -> str:
-    """Generate prompt for full year statements."""
-    return f"""You are a specialized brokerage statement parser for Dutch tax purposes.
+# System prompt for full year statements
+_FULL_YEAR_PROMPT = """You are a specialized brokerage statement parser for Dutch tax purposes.
 
 Extract Box 3 wealth data from a FULL YEAR brokerage statement.
 
@@ -447,17 +491,14 @@ IMPORTANT DATE MAPPING:
 - If document only has one of these dates, that's fine - set the other to null
 - For original_value, use value_eur_jan1 if available, otherwise use value_eur_dec31
 
-Document:
-{doc_text}
-
 Return JSON in this EXACT format:
-{{
-  "document_date_range": {{
+{
+  "document_date_range": {
     "start_date": "YYYY-MM-DD" or null,
     "end_date": "YYYY-MM-DD" or null
-  }},
+  },
   "box3_items": [
-    {{
+    {
       "asset_type": "savings" or "stocks" or "bonds" or "crypto" or "other",
       "value_eur_jan1": <value in original currency or null if not available, or null if only individual positions are shown>,
       "value_eur_dec31": <value in original currency or null if not available, or null if only individual positions are shown>,
@@ -471,18 +512,18 @@ Return JSON in this EXACT format:
       "account_number": "Account number or identifier if available (e.g., '872', '123456789') or null",
       "extraction_confidence": <0.0 to 1.0>,
       "individual_positions": [
-        {{
+        {
           "symbol": "AAPL" or ticker symbol,
           "description": "Full name of the security (e.g., 'Apple Inc.')",
           "quantity": <number of shares (required)>,
           "price": <price per share in original currency (required)>,
           "currency": "USD" or "EUR" or other currency code,
           "date": "YYYY-MM-DD" (the date this price is for, e.g., "2024-01-01" or "2024-12-31")
-        }}
+        }
       ] or null (only include for investment accounts with individual positions shown)
-    }}
+    }
   ]
-}}
+}
 
 Examples:
 - Full year statement showing $10,000 cash and $50,000 in stocks on both Jan 1 and Dec 31:
@@ -511,67 +552,82 @@ Examples:
   → CORRECT: Extract individual_positions array with both positions, value_eur_dec31=null (no explicit total, validator will sum)
   → WRONG: value_eur_dec31=2850 (DO NOT calculate by summing positions!)
 
-If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {{"box3_items": [], "document_date_range": {{"start_date": null, "end_date": null}}}}
+If you cannot find BOTH cash AND investment account values (neither can be extracted), return: {"box3_items": [], "document_date_range": {"start_date": null, "end_date": null}}
 """
 
 
-@traceable(name="Investment Broker Parser Agent")
-def investment_broker_parser_agent(input_data: dict) -> dict:
-    """Parse investment brokerage statements for Box 3 assets.
-    
-    Handles both US and European investment broker statements.
-    
-    Extracts:
-    - Investment portfolio value on Jan 1
-    - Realized gains/losses during the year
-    - Currency (USD, EUR, or other)
-    
-    Args:
-        input_data: Dict with doc_id, doc_text, filename, classification
-        
-    Returns:
-        Dict with extracted Box 3 asset data (will be converted to EUR later)
-    """
+_PROMPTS_BY_SUBTYPE = {
+    "jan_period": _JAN_PERIOD_PROMPT,
+    "dec_period": _DEC_PERIOD_PROMPT,
+    "dec_prev_year": _DEC_PREV_YEAR_PROMPT,
+    "full_year": _FULL_YEAR_PROMPT,
+}
+
+
+def _skip_result(input_data: dict) -> dict | None:
+    """Return the empty extraction result if the LLM call can be skipped, else None."""
     doc_id = input_data["doc_id"]
     doc_text = input_data["doc_text"]
     filename = input_data["filename"]
-    classification = input_data.get("classification", {})
-    statement_subtype = classification.get("statement_subtype")
 
-    logger.info(
-        f"Investment broker parser processing {filename} "
-        f"(subtype: {statement_subtype or 'unknown'})"
-    )
+    # Too little text to hold a statement: nothing to extract
+    if len(doc_text.strip()) < _MIN_DOC_CHARS:
+        status = "success"
+        warning = "Document has too little text, LLM extraction skipped"
+    # Enough text but no known keyword: possibly a statement in an unsupported
+    # language or layout, so flag it for review instead of reporting no assets
+    elif _BROKER_KEYWORDS_RE.search(doc_text) is None:
+        status = "partial"
+        warning = (
+            "No brokerage keywords found, LLM extraction skipped. "
+            "Check whether this document holds Box 3 assets"
+        )
+    else:
+        return None
+
+    logger.warning(f"Skipping LLM extraction for {filename}: {warning}")
+    return {
+        "extraction_results": [
+            {
+                "doc_id": doc_id,
+                "source_filename": filename,
+                "status": status,
+                "extracted_data": {
+                    "box3_items": [],
+                    "document_date_range": {"start_date": None, "end_date": None},
+                },
+                "errors": [],
+                "warnings": [warning],
+            }
+        ]
+    }
+
 
-    llm = create_llm(temperature=0)
+def _broker_messages(input_data: dict) -> list[BaseMessage]:
+    """Build the chat messages using the system prompt for the statement subtype."""
+    filename = input_data["filename"]
+    statement_subtype = input_data.get("classification", {}).get("statement_subtype")
 
     # Select prompt based on statement subtype
-    if statement_subtype == "jan_period":
-        prompt = _get_jan_period_prompt(doc_text)
-    elif statement_subtype == "dec_period":
-        prompt = _get_dec_period_prompt(doc_text)
-    elif statement_subtype == "dec_prev_year":
-        prompt = _get_dec_prev_year_prompt(doc_text)
-    elif statement_subtype == "full_year":
-        prompt = _get_full_year_prompt(doc_text)
-    else:
+    system_prompt = _PROMPTS_BY_SUBTYPE.get(statement_subtype)
+    if system_prompt is None:
         # Fallback to a generic prompt if subtype is not available
         logger.warning(
             f"No statement subtype provided for {filename}, using generic prompt"
         )
-        prompt = _get_full_year_prompt(doc_text)  # Use full_year as default fallback
+        system_prompt = _FULL_YEAR_PROMPT  # Use full_year as default fallback
+    doc_text = select_pages(input_data["doc_text"], _BROKER_PAGE_KEYWORDS_RE)
+    return build_messages(system_prompt, compress_doc_text(doc_text))
 
-    try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        response_text = response.content.strip()
 
-        # Clean markdown
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+def _process_response(input_data: dict, response_text: str) -> dict:
+    """Parse the LLM reply and fill defaults and missing cash/investment accounts."""
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
 
-        extracted_data = json.loads(response_text)
+    try:
+        # Parse JSON, tolerating markdown fences and surrounding prose
+        extracted_data = parse_json_response(response_text)
 
         # Ensure document_date_range exists
         if "document_date_range" not in extracted_data:
@@ -579,23 +635,15 @@ def investment_broker_parser_agent(input_data: dict) -> dict:
 
         # Ensure currency is set (default to USD for US brokers, but preserve EUR for crypto exchanges)
         box3_items = extracted_data.get("box3_items", [])
+        # Infer missing reference dates from document_date_range or default to Jan 1
+        default_reference_date = (
+            extracted_data.get("document_date_range", {}).get("start_date")
+            or _DEFAULT_JAN1
+        )
         for item in box3_items:
-            if "original_currency" not in item:
-                # Default to USD for US brokers, but validator will handle currency conversion
-                item["original_currency"] = "USD"
-            if "reference_date" not in item:
-                # Try to infer from document_date_range or default to Jan 1
-                doc_start = extracted_data.get("document_date_range", {}).get("start_date")
-                if doc_start:
-                    item["reference_date"] = doc_start
-                else:
-                    item["reference_date"] = date(2024, 1, 1).isoformat()
-            if "dec31_reference_date" not in item:
-                item["dec31_reference_date"] = None
-            if "value_eur_jan1" not in item:
-                item["value_eur_jan1"] = None
-            if "value_eur_dec31" not in item:
-                item["value_eur_dec31"] = None
+            item.setdefault("reference_date", default_reference_date)
+            for key, value in _BOX3_ITEM_DEFAULTS.items():
+                item.setdefault(key, value)
             # Set original_value if not set (use jan1 if available, otherwise dec31)
             if "original_value" not in item:
                 if item.get("value_eur_jan1") is not None:
@@ -604,11 +652,6 @@ def investment_broker_parser_agent(input_data: dict) -> dict:
                     item["original_value"] = item["value_eur_dec31"]
                 else:
                     item["original_value"] = None
-            if "extraction_confidence" not in item:
-                # Default to 0.8 to match classification confidence default
-                item["extraction_confidence"] = 0.8
-            if "account_number" not in item:
-                item["account_number"] = None
             
             # Validate and log individual positions if present
             if "individual_positions" in item and item["individual_positions"]:
@@ -636,18 +679,19 @@ def investment_broker_parser_agent(input_data: dict) -> dict:
 
         # Post-processing: Ensure both cash (savings) and investment (stocks/crypto) accounts are present
         # If one is missing, add it with 0 value
-        has_cash = any(item.get("asset_type") in ["savings", "checking"] for item in box3_items)
-        has_investment = any(
-            item.get("asset_type") in ["stocks", "bonds", "crypto", "other"]
-            for item in box3_items
-        )
-        
-        # Determine reference dates and account_number from existing items
+        # Single pass: detect account types and collect reference dates and account_number
+        has_cash = False
+        has_investment = False
         reference_date = None
         dec31_reference_date = None
         original_currency = "USD"
         account_number = None
         for item in box3_items:
+            asset_type = item.get("asset_type")
+            if asset_type in ("savings", "checking"):
+                has_cash = True
+            elif asset_type in ("stocks", "bonds", "crypto", "other"):
+                has_investment = True
             if item.get("reference_date"):
                 reference_date = item["reference_date"]
             if item.get("dec31_reference_date"):
@@ -663,7 +707,7 @@ def investment_broker_parser_agent(input_data: dict) -> dict:
             if doc_start:
                 reference_date = doc_start
             else:
-                reference_date = date(2024, 1, 1).isoformat()
+                reference_date = _DEFAULT_JAN1
         
         # Add missing cash account with 0 value
         if not has_cash and has_investment:
@@ -675,20 +719,17 @@ def investment_broker_parser_agent(input_data: dict) -> dict:
             else:
                 value_jan1 = 0.0
             
-            cash_item = {
-                "asset_type": "savings",
+            cash_item = _DEFAULT_CASH_ITEM.copy()
+            cash_item.update({
                 "value_eur_jan1": value_jan1,
                 "value_eur_dec31": value_dec31,
                 "original_value": value_jan1 if value_jan1 is not None else value_dec31,
                 "original_currency": original_currency,
-                "realized_gains_eur": None,
-                "realized_losses_eur": None,
                 "reference_date": reference_date,
                 "dec31_reference_date": dec31_reference_date,
                 "description": f"{filename} Cash Account (defaulted to 0)",
                 "account_number": account_number,  # Use account_number from other items if available
-                "extraction_confidence": 0.5,  # Lower confidence since it's inferred
-            }
+            })
             box3_items.append(cash_item)
             logger.info(f"Added missing cash account with 0 value for {filename}")
         
@@ -702,20 +743,17 @@ def investment_broker_parser_agent(input_data: dict) -> dict:
             else:
                 value_jan1 = 0.0
             
-            investment_item = {
-                "asset_type": "stocks",  # Default to stocks for investment account
+            investment_item = _DEFAULT_INVESTMENT_ITEM.copy()
+            investment_item.update({
                 "value_eur_jan1": value_jan1,
                 "value_eur_dec31": value_dec31,
                 "original_value": value_jan1 if value_jan1 is not None else value_dec31,
                 "original_currency": original_currency,
-                "realized_gains_eur": None,
-                "realized_losses_eur": None,
                 "reference_date": reference_date,
                 "dec31_reference_date": dec31_reference_date,
                 "description": f"{filename} Investment Account (defaulted to 0)",
                 "account_number": account_number,  # Use account_number from other items if available
-                "extraction_confidence": 0.5,  # Lower confidence since it's inferred
-            }
+            })
             box3_items.append(investment_item)
             logger.info(f"Added missing investment account with 0 value for {filename}")
         
@@ -740,32 +778,93 @@ def investment_broker_parser_agent(input_data: dict) -> dict:
             ]
         }
 
-    except json.JSONDecodeError as e:
+    except OutputParserException as e:
         logger.error(f"JSON parsing error in investment broker parser: {e}")
-        return {
-            "extraction_results": [
-                {
-                    "doc_id": doc_id,
-                    "source_filename": filename,
-                    "status": "error",
-                    "extracted_data": {},
-                    "errors": [f"JSON parsing error: {e}"],
-                    "warnings": [],
-                }
-            ]
-        }
+        return _error_result(doc_id, filename, f"JSON parsing error: {e}")
     except Exception as e:
         logger.error(f"Investment broker parser failed: {e}")
-        return {
-            "extraction_results": [
-                {
-                    "doc_id": doc_id,
-                    "source_filename": filename,
-                    "status": "error",
-                    "extracted_data": {},
-                    "errors": [str(e)],
-                    "warnings": [],
-                }
-            ]
-        }
+        return _error_result(doc_id, filename, e)
+
+
+@traceable(name="Investment Broker Parser Agent")
+def investment_broker_parser_agent(input_data: dict) -> dict:
+    """Parse investment brokerage statements for Box 3 assets.
+    
+    Handles both US and European investment broker statements.
+    
+    Extracts:
+    - Investment portfolio value on Jan 1
+    - Realized gains/losses during the year
+    - Currency (USD, EUR, or other)
+    
+    Args:
+        input_data: Dict with doc_id, doc_text, filename, classification
+        
+    Returns:
+        Dict with extracted Box 3 asset data (will be converted to EUR later)
+    """
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
+    statement_subtype = input_data.get("classification", {}).get("statement_subtype")
+
+    logger.info(
+        f"Investment broker parser processing {filename} "
+        f"(subtype: {statement_subtype or 'unknown'})"
+    )
+
+    skipped = _skip_result(input_data)
+    if skipped is not None:
+        return skipped
+
+    llm = create_llm(
+        temperature=0, json_mode=True, use_cache=True, model=settings.parser_model
+    )
+
+    try:
+        # invoke, not stream: the reply is only parsed once complete, and streaming
+        # would bypass the optional response cache
+        response_text = llm.invoke(_broker_messages(input_data)).content
+    except Exception as e:
+        logger.error(f"Investment broker parser failed: {e}")
+        return _error_result(doc_id, filename, e)
+
+    return _process_response(input_data, response_text)
+
+
+@traceable(name="Investment Broker Parser Agent")
+async def investment_broker_parser_agent_async(input_data: dict) -> dict:
+    """Async variant of investment_broker_parser_agent, used when the graph runs via ainvoke.
+    
+    Awaits the LLM call so parallel parser nodes share one event loop instead
+    of each blocking a worker thread.
+    
+    Args:
+        input_data: Dict with doc_id, doc_text, filename, classification
+        
+    Returns:
+        Dict with extracted Box 3 asset data (will be converted to EUR later)
+    """
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
+    statement_subtype = input_data.get("classification", {}).get("statement_subtype")
+
+    logger.info(
+        f"Investment broker parser processing {filename} "
+        f"(subtype: {statement_subtype or 'unknown'})"
+    )
+
+    skipped = _skip_result(input_data)
+    if skipped is not None:
+        return skipped
+
+    llm = create_llm(
+        temperature=0, json_mode=True, use_cache=True, model=settings.parser_model
+    )
+
+    try:
+        response = await llm.ainvoke(_broker_messages(input_data))
+    except Exception as e:
+        logger.error(f"Investment broker parser failed: {e}")
+        return _error_result(doc_id, filename, e)
 
+    return _process_response(input_data, response.content)
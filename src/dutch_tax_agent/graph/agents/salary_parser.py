@@ -1,46 +1,56 @@
 """Salary statement parser agent."""
 
-import json
 import logging
 import re
 from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
 
-from langchain_core.messages import HumanMessage
+from langchain_core.exceptions import OutputParserException
 from langsmith import traceable
 
+from dutch_tax_agent.config import settings
+from dutch_tax_agent.graph.agents._agent_utils import (
+    _error_result,
+    build_messages,
+    compress_doc_text,
+    parse_json_response,
+)
 from dutch_tax_agent.llm_factory import create_llm
 
 logger = logging.getLogger(__name__)
 
+# Documents shorter than this (after stripping) cannot hold a usable salary statement
+_MIN_DOC_CHARS = 200
 
-@traceable(name="Salary Parser Agent")
-def salary_parser_agent(input_data: dict) -> dict:
-    """Parse salary statements for Box 1 income.
-    
-    Extracts:
-    - Gross salary amount
-    - Tax withheld
-    - Period of employment
-    
-    Args:
-        input_data: Dict with doc_id, doc_text, filename, classification
-        
-    Returns:
-        Dict with extracted Box 1 income data
-    """
-    doc_id = input_data["doc_id"]
-    doc_text = input_data["doc_text"]
-    filename = input_data["filename"]
+# Defaults for Box 1 item fields the LLM may omit (the validator node converts types)
+_BOX1_ITEM_DEFAULTS = MappingProxyType({
+    "original_currency": "EUR",
+    # Default to 0.8 to match classification confidence default
+    "extraction_confidence": 0.8,
+    "tax_withheld_eur": 0.0,
+})
 
-    logger.info(f"Salary parser processing {filename}")
+# At least one of these must appear before we spend an LLM call on the document
+_SALARY_KEYWORDS_RE = re.compile(
+    r"salaris|loon|bruto|inhouding|jaaropgaaf|salary|gross|payslip",
+    re.IGNORECASE,
+)
 
-    llm = create_llm(temperature=0)
 
-    # Get tax year from classification if available
-    classification = input_data.get("classification", {})
-    tax_year = classification.get("tax_year")
-    
-    prompt = f"""You are a specialized salary statement parser for Dutch tax purposes.
+@lru_cache(maxsize=512)
+def _parse_iso(value: str) -> date:
+    """Parse an ISO date string, cached because payslip periods repeat across items."""
+    return date.fromisoformat(value)
+
+
+def _year_bounds(year: int) -> tuple[str, str]:
+    """Return the ISO-formatted Jan 1 and Dec 31 of a tax year."""
+    return date(year, 1, 1).isoformat(), date(year, 12, 31).isoformat()
+
+
+# System prompt for salary statements
+_SALARY_PROMPT = """You are a specialized salary statement parser for Dutch tax purposes.
 
 Extract Box 1 income data (employment income).
 
@@ -53,17 +63,14 @@ IMPORTANT:
 6. All amounts should be in EUR
 7. Return ONLY valid JSON
 
-Document:
-{doc_text}
-
 Return JSON in this EXACT format:
-{{
-  "document_date_range": {{
+{
+  "document_date_range": {
     "start_date": "YYYY-MM-DD" or null,
     "end_date": "YYYY-MM-DD" or null
-  }},
+  },
   "box1_items": [
-    {{
+    {
       "income_type": "salary" or "bonus" or "freelance",
       "gross_amount_eur": <number>,
       "tax_withheld_eur": <number>,
@@ -71,27 +78,67 @@ Return JSON in this EXACT format:
       "period_end": "YYYY-MM-DD",
       "original_currency": "EUR",
       "extraction_confidence": <0.0 to 1.0>
-    }}
+    }
   ]
-}}
+}
 
 For year-end statements (Jaaropgaaf), set document_date_range to cover the full tax year.
 For monthly/quarterly statements, set document_date_range to the period covered by the statement.
 
-If no income data found, return: {{"box1_items": [], "document_date_range": {{"start_date": null, "end_date": null}}}}
+If no income data found, return: {"box1_items": [], "document_date_range": {"start_date": null, "end_date": null}}
 """
 
-    try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        response_text = response.content.strip()
 
-        # Clean markdown
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+def _skip_result(input_data: dict) -> dict | None:
+    """Return the empty extraction result if the LLM call can be skipped, else None."""
+    doc_id = input_data["doc_id"]
+    doc_text = input_data["doc_text"]
+    filename = input_data["filename"]
+
+    # Too little text to hold a statement: nothing to extract
+    if len(doc_text.strip()) < _MIN_DOC_CHARS:
+        status = "success"
+        warning = "Document has too little text, LLM extraction skipped"
+    # Enough text but no known keyword: flag it for review instead of reporting no income
+    elif _SALARY_KEYWORDS_RE.search(doc_text) is None:
+        status = "partial"
+        warning = (
+            "No salary keywords found, LLM extraction skipped. "
+            "Check whether this document holds Box 1 income"
+        )
+    else:
+        return None
+
+    logger.warning(f"Skipping LLM extraction for {filename}: {warning}")
+    return {
+        "extraction_results": [
+            {
+                "doc_id": doc_id,
+                "source_filename": filename,
+                "status": status,
+                "extracted_data": {
+                    "box1_items": [],
+                    "document_date_range": {"start_date": None, "end_date": None},
+                },
+                "errors": [],
+                "warnings": [warning],
+            }
+        ]
+    }
+
+
+def _process_response(input_data: dict, response_text: str) -> dict:
+    """Parse the LLM reply, infer the document date range and fill defaults."""
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
+
+    # Get tax year from classification if available
+    classification = input_data.get("classification", {})
+    tax_year = classification.get("tax_year")
 
-        extracted_data = json.loads(response_text)
+    try:
+        # Parse JSON, tolerating markdown fences and surrounding prose
+        extracted_data = parse_json_response(response_text)
 
         # Ensure document_date_range exists
         if "document_date_range" not in extracted_data:
@@ -124,38 +171,41 @@ If no income data found, return: {{"box1_items": [], "document_date_range": {{"s
             # Try to infer from box1_items periods
             box1_items = extracted_data.get("box1_items", [])
             if box1_items:
-                # Find the earliest period_start and latest period_end
-                period_starts = []
-                period_ends = []
+                # Find the earliest period_start and latest period_end in a single pass
+                inferred_start = None
+                inferred_end = None
                 for item in box1_items:
-                    if item.get("period_start"):
+                    period_start = item.get("period_start")
+                    if period_start:
                         try:
-                            period_starts.append(date.fromisoformat(item["period_start"]))
+                            parsed = _parse_iso(period_start)
+                            if inferred_start is None or parsed < inferred_start:
+                                inferred_start = parsed
                         except (ValueError, TypeError):
                             pass
-                    if item.get("period_end"):
+                    period_end = item.get("period_end")
+                    if period_end:
                         try:
-                            period_ends.append(date.fromisoformat(item["period_end"]))
+                            parsed = _parse_iso(period_end)
+                            if inferred_end is None or parsed > inferred_end:
+                                inferred_end = parsed
                         except (ValueError, TypeError):
                             pass
                 
-                if period_starts and period_ends:
-                    inferred_start = min(period_starts)
-                    inferred_end = max(period_ends)
-                    
+                if inferred_start is not None and inferred_end is not None:
                     # If this is a year-end statement and we have a tax year, use full year
                     if is_jaaropgaaf and inferred_tax_year:
-                        inferred_start = date(inferred_tax_year, 1, 1)
-                        inferred_end = date(inferred_tax_year, 12, 31)
+                        start_iso, end_iso = _year_bounds(inferred_tax_year)
+                    else:
+                        start_iso, end_iso = inferred_start.isoformat(), inferred_end.isoformat()
                     
                     if not doc_start:
-                        doc_start = inferred_start.isoformat()
+                        doc_start = start_iso
                     if not doc_end:
-                        doc_end = inferred_end.isoformat()
+                        doc_end = end_iso
                 elif is_jaaropgaaf and inferred_tax_year:
                     # For year-end statements, use full tax year
-                    doc_start = date(inferred_tax_year, 1, 1).isoformat()
-                    doc_end = date(inferred_tax_year, 12, 31).isoformat()
+                    doc_start, doc_end = _year_bounds(inferred_tax_year)
             
             # Update document_date_range
             extracted_data["document_date_range"] = {
@@ -165,13 +215,8 @@ If no income data found, return: {{"box1_items": [], "document_date_range": {{"s
 
         # Validate and set defaults
         for item in extracted_data.get("box1_items", []):
-            if "original_currency" not in item:
-                item["original_currency"] = "EUR"
-            if "extraction_confidence" not in item:
-                # Default to 0.8 to match classification confidence default
-                item["extraction_confidence"] = 0.8
-            if "tax_withheld_eur" not in item:
-                item["tax_withheld_eur"] = 0.0
+            for key, value in _BOX1_ITEM_DEFAULTS.items():
+                item.setdefault(key, value)
 
         logger.info(
             f"Salary parser extracted {len(extracted_data.get('box1_items', []))} items, "
@@ -193,33 +238,82 @@ If no income data found, return: {{"box1_items": [], "document_date_range": {{"s
             ]
         }
 
-    except json.JSONDecodeError as e:
+    except OutputParserException as e:
         logger.error(f"JSON parsing error in salary parser: {e}")
-        return {
-            "extraction_results": [
-                {
-                    "doc_id": doc_id,
-                    "source_filename": filename,
-                    "status": "error",
-                    "extracted_data": {},
-                    "errors": [f"JSON parsing error: {e}"],
-                    "warnings": [],
-                }
-            ]
-        }
+        return _error_result(doc_id, filename, f"JSON parsing error: {e}")
     except Exception as e:
         logger.error(f"Salary parser failed: {e}")
-        return {
-            "extraction_results": [
-                {
-                    "doc_id": doc_id,
-                    "source_filename": filename,
-                    "status": "error",
-                    "extracted_data": {},
-                    "errors": [str(e)],
-                    "warnings": [],
-                }
-            ]
-        }
+        return _error_result(doc_id, filename, e)
+
+
+@traceable(name="Salary Parser Agent")
+def salary_parser_agent(input_data: dict) -> dict:
+    """Parse salary statements for Box 1 income.
+    
+    Extracts:
+    - Gross salary amount
+    - Tax withheld
+    - Period of employment
+    
+    Args:
+        input_data: Dict with doc_id, doc_text, filename, classification
+        
+    Returns:
+        Dict with extracted Box 1 income data
+    """
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
 
+    logger.info(f"Salary parser processing {filename}")
+
+    skipped = _skip_result(input_data)
+    if skipped is not None:
+        return skipped
+
+    llm = create_llm(
+        temperature=0, json_mode=True, use_cache=True, model=settings.parser_model
+    )
+    messages = build_messages(_SALARY_PROMPT, compress_doc_text(input_data["doc_text"]))
+
+    try:
+        # invoke, not stream: the reply is only parsed once complete, and streaming
+        # would bypass the optional response cache
+        response_text = llm.invoke(messages).content
+    except Exception as e:
+        logger.error(f"Salary parser failed: {e}")
+        return _error_result(doc_id, filename, e)
+
+    return _process_response(input_data, response_text)
+
+
+@traceable(name="Salary Parser Agent")
+async def salary_parser_agent_async(input_data: dict) -> dict:
+    """Async variant of salary_parser_agent, used when the graph runs via ainvoke.
+    
+    Args:
+        input_data: Dict with doc_id, doc_text, filename, classification
+        
+    Returns:
+        Dict with extracted Box 1 income data
+    """
+    doc_id = input_data["doc_id"]
+    filename = input_data["filename"]
+
+    logger.info(f"Salary parser processing {filename}")
+
+    skipped = _skip_result(input_data)
+    if skipped is not None:
+        return skipped
+
+    llm = create_llm(
+        temperature=0, json_mode=True, use_cache=True, model=settings.parser_model
+    )
+    messages = build_messages(_SALARY_PROMPT, compress_doc_text(input_data["doc_text"]))
+
+    try:
+        response = await llm.ainvoke(messages)
+    except Exception as e:
+        logger.error(f"Salary parser failed: {e}")
+        return _error_result(doc_id, filename, e)
 
+    return _process_response(input_data, response.content)
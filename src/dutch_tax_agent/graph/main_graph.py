@@ -4,17 +4,25 @@ This module only contains graph construction logic. All nodes are defined
 in their respective modules under graph/nodes/.
 """
 
+import atexit
 import logging
 import os
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import StateGraph, START, END
 
 from dutch_tax_agent.config import settings
 from dutch_tax_agent.graph.agents import (
     dutch_parser_agent,
+    dutch_parser_agent_async,
     investment_broker_parser_agent,
+    investment_broker_parser_agent_async,
     salary_parser_agent,
+    salary_parser_agent_async,
 )
 from dutch_tax_agent.graph.nodes import (
     aggregate_extraction_node,
@@ -34,6 +42,15 @@ logger = logging.getLogger(__name__)
 # Store context managers to keep database connections alive
 _active_checkpointer_contexts = []
 
+# Entered checkpointer context managers are closed (flushing and closing their
+# database connections) when the interpreter exits
+_checkpointer_exit_stack = ExitStack()
+atexit.register(_checkpointer_exit_stack.close)
+
+# One SqliteSaver per database file; sharing the connection avoids opening a
+# new connection (and competing for the write lock) on every graph creation
+_sqlite_checkpointers: dict[Path, object] = {}
+
 
 def get_active_checkpointer_contexts():
     """Get the list of active checkpointer context managers.
@@ -47,6 +64,23 @@ def get_active_checkpointer_contexts():
     return _active_checkpointer_contexts
 
 
+def _tune_sqlite_connection(conn) -> None:
+    """Apply write-friendly pragmas to the checkpoint database connection.
+    
+    WAL lets HITL replays read while a new step writes, and synchronous=NORMAL
+    only fsyncs at WAL checkpoints instead of on every commit, which is still
+    crash-safe in WAL mode (a crash can at most lose the last step).
+    
+    Args:
+        conn: sqlite3 connection used by the SqliteSaver
+    """
+    journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    logger.info(f"Checkpoint database journal mode: {journal_mode}")
+
+
 def create_checkpointer():
     """Create a checkpointer based on configuration.
     
@@ -69,15 +103,18 @@ def create_checkpointer():
             from langgraph.checkpoint.sqlite import SqliteSaver
             # Resolve path to expand ~ and get absolute path
             db_path = settings.checkpoint_db_path.expanduser().resolve()
+            if db_path in _sqlite_checkpointers:
+                return _sqlite_checkpointers[db_path]
             # Ensure parent directory exists
             db_path.parent.mkdir(parents=True, exist_ok=True)
             # from_conn_string returns a context manager, we need to enter it to get the instance
-            # Store the context manager to keep the connection alive
             # Use absolute path string to ensure SQLite can create the file
             cm = SqliteSaver.from_conn_string(str(db_path))
-            instance = cm.__enter__()
+            instance = _checkpointer_exit_stack.enter_context(cm)
+            _tune_sqlite_connection(instance.conn)
             # Store context manager to prevent garbage collection and connection closure
             _active_checkpointer_contexts.append(cm)
+            _sqlite_checkpointers[db_path] = instance
             return instance
         except ImportError:
             logger.warning(
@@ -97,7 +134,7 @@ def create_checkpointer():
             # from_conn_string returns a context manager, we need to enter it to get the instance
             # Store the context manager to keep the connection alive
             cm = PostgresSaver.from_conn_string(postgres_uri)
-            instance = cm.__enter__()
+            instance = _checkpointer_exit_stack.enter_context(cm)
             # Store context manager to prevent garbage collection and connection closure
             _active_checkpointer_contexts.append(cm)
             return instance
@@ -113,8 +150,12 @@ def create_checkpointer():
         return MemorySaver()
 
 
-def create_tax_graph() -> StateGraph:
-    """Create the main tax processing graph with HITL support.
+@lru_cache(maxsize=1)
+def _build_graph() -> StateGraph:
+    """Build the main tax processing graph with HITL support.
+    
+    The topology is static, so the builder is constructed once per process
+    and compiled per create_tax_graph call.
     
     Graph flow:
     1. START -> dispatcher (routes documents via Command + Send)
@@ -129,7 +170,7 @@ def create_tax_graph() -> StateGraph:
     9. statutory_calculation + actual_return -> comparison -> complete
     
     Returns:
-        Compiled StateGraph
+        Uncompiled StateGraph
     """
     logger.info("Creating main tax processing graph with HITL support")
 
@@ -140,9 +181,20 @@ def create_tax_graph() -> StateGraph:
     graph.add_node("dispatcher", dispatcher_node)
     
     # Parser agents (called via Send from dispatcher's Command)
-    graph.add_node("dutch_parser", dutch_parser_agent)
-    graph.add_node("investment_broker_parser", investment_broker_parser_agent)
-    graph.add_node("salary_parser", salary_parser_agent)
+    # Each has a sync and an async implementation: graph.invoke/stream uses the sync
+    # one, graph.ainvoke/astream awaits the LLM calls on a single event loop
+    graph.add_node(
+        "dutch_parser",
+        RunnableLambda(dutch_parser_agent, afunc=dutch_parser_agent_async),
+    )
+    graph.add_node(
+        "investment_broker_parser",
+        RunnableLambda(investment_broker_parser_agent, afunc=investment_broker_parser_agent_async),
+    )
+    graph.add_node(
+        "salary_parser",
+        RunnableLambda(salary_parser_agent, afunc=salary_parser_agent_async),
+    )
     
     # Validator (processes results from parsers)
     graph.add_node("validator", validator_node)
@@ -158,8 +210,7 @@ def create_tax_graph() -> StateGraph:
     graph.add_node("start_box3", start_box3_node)
     graph.add_node("statutory_calculation", statutory_calculation_node)
     graph.add_node("actual_return", actual_return_node)
-    # Use defer=True to ensure comparison only runs once after both branches complete
-    graph.add_node("comparison", comparison_node, defer=True)
+    graph.add_node("comparison", comparison_node)
 
     # Define edges
     graph.add_edge(START, "dispatcher")
@@ -193,15 +244,28 @@ def create_tax_graph() -> StateGraph:
     graph.add_edge("start_box3", "actual_return")
     
     # Join: Both branches feed into comparison
-    # The defer=True parameter ensures comparison only runs once after both branches complete
-    graph.add_edge("statutory_calculation", "comparison")
-    graph.add_edge("actual_return", "comparison")
+    # A multi-source edge is a barrier channel: comparison runs exactly once, in the
+    # step after both branches have written, without deferring to the end of the run
+    graph.add_edge(["statutory_calculation", "actual_return"], "comparison")
     
     # Comparison completes the flow
     graph.add_edge("comparison", END)
 
     logger.info("Main tax graph created successfully with HITL support")
 
+    return graph
+
+
+def create_tax_graph() -> StateGraph:
+    """Compile the main tax processing graph with the configured checkpointer.
+    
+    See _build_graph for the graph flow.
+    
+    Returns:
+        Compiled StateGraph
+    """
+    graph = _build_graph()
+
     # Compile with checkpointer
     checkpointer = create_checkpointer()
     if checkpointer:
@@ -213,7 +277,13 @@ def create_tax_graph() -> StateGraph:
             interrupt_before=["hitl_control"]
         )
     else:
-        logger.info("Compiling graph without checkpointing")
-        return graph.compile()
+        return _compile_without_checkpointer()
+
+
+@lru_cache(maxsize=1)
+def _compile_without_checkpointer():
+    """Compile the graph without checkpointing; stateless, so compiled once."""
+    logger.info("Compiling graph without checkpointing")
+    return _build_graph().compile()
 
 
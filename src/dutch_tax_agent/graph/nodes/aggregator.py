@@ -1,19 +1,105 @@
 """Aggregation and orchestration nodes for the main graph."""
 
 import logging
-from collections import defaultdict
+import math
+import re
+from dataclasses import dataclass
 from datetime import date, datetime
+from functools import lru_cache
 
 from rich.console import Console
 from rich.table import Table
 from rich.text import Text
 
+from dutch_tax_agent.config import settings
 from dutch_tax_agent.schemas.state import TaxGraphState
 from dutch_tax_agent.schemas.tax_entities import Box1Income, Box3Asset
 
 logger = logging.getLogger(__name__)
 console = Console()
 
+# Validator error for a Box3 item with neither value (see validators.py); the
+# pydantic message spans several lines, hence DOTALL
+_MISSING_VALUES_ERROR_RE = re.compile(
+    r"Box3 validation error in (?P<filename>[^:]+):"
+    r".*must have at least one of value_eur_jan1 or value_eur_dec31",
+    re.DOTALL,
+)
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso_date(value: str) -> date | None:
+    """Parse an ISO date string, returning None if it is not a valid date.
+    
+    Strings longer than a date ("2024-01-01T00:00:00") are parsed as a datetime.
+    """
+    try:
+        if len(value) > 10:
+            return datetime.fromisoformat(value).date()
+        return date.fromisoformat(value)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _as_date(value) -> date | None:
+    """Normalize a document_date_range bound (ISO string or date) to a date."""
+    if value and isinstance(value, str):
+        return _parse_iso_date(value)
+    return value if isinstance(value, date) else None
+
+
+def _index_extracted_box3_items(box3_items: list[dict]) -> dict[tuple, dict]:
+    """Index a document's raw extracted Box3 items by account key.
+    
+    Keys are ("account_number", account_number, asset_type) when the item has an
+    account number, otherwise ("description", description, asset_type), so a
+    validated asset is matched back to its extracted item with one dict lookup.
+    The first item per key wins.
+    """
+    box3_index: dict[tuple, dict] = {}
+    for extracted_item in box3_items:
+        # Match by account_number if available, otherwise by description
+        if extracted_item.get("account_number"):
+            item_key = (
+                "account_number",
+                extracted_item.get("account_number"),
+                extracted_item.get("asset_type"),
+            )
+        else:
+            item_key = (
+                "description",
+                extracted_item.get("description"),
+                extracted_item.get("asset_type"),
+            )
+        box3_index.setdefault(item_key, extracted_item)
+    return box3_index
+
+
+@dataclass(slots=True)
+class AssetMeta:
+    """A Box 3 asset with the extraction metadata used to merge accounts.
+    
+    Defaults apply to assets from earlier ingestions: their values count as
+    extracted and their document date range is unknown.
+    """
+
+    asset: Box3Asset
+    jan1_extracted: bool = True
+    dec31_extracted: bool = True
+    doc_start: date | None = None
+    doc_end: date | None = None
+
+
+def _account_key(asset: Box3Asset) -> tuple[str, str, str]:
+    """Return the key identifying an asset's account.
+    
+    Format: (match_type, identifier, asset_type) where match_type is "account_number"
+    or "description" (fallback when the asset has no account number).
+    """
+    if asset.account_number:
+        return ("account_number", asset.account_number, asset.asset_type)
+    return ("description", asset.description or "", asset.asset_type)
+
 
 def aggregate_extraction_node(state: TaxGraphState) -> dict:
     """Aggregate validated results into the state.
@@ -30,23 +116,48 @@ def aggregate_extraction_node(state: TaxGraphState) -> dict:
     # Get the IDs of documents currently being processed in this run
     # This is crucial because validated_results accumulates across runs (Annotated[list, add])
     # We only want to aggregate results for the documents in the current batch
-    current_doc_ids = {doc.doc_id for doc in state.documents}
+    documents = state.documents
+    current_doc_ids = {doc.doc_id for doc in documents}
     
     # Filter validated results to only include those from the current batch
     # This prevents re-aggregating results from previous runs which would cause duplicates
+    # The validator adds one result per document and the current batch is appended last,
+    # so scan from the end and stop once every current document is found rather than
+    # filtering the whole history
     all_validated_results = state.validated_results
-    validated_results = [
-        r for r in all_validated_results 
-        if r.get("doc_id") in current_doc_ids
-    ]
+    validated_results = []
+    remaining_doc_ids = set(current_doc_ids)
+    for r in reversed(all_validated_results):
+        if not remaining_doc_ids:
+            break
+        doc_id = r.get("doc_id")
+        if doc_id in remaining_doc_ids:
+            remaining_doc_ids.discard(doc_id)
+            validated_results.append(r)
+    validated_results.reverse()
     
     logger.info(
         f"Aggregating {len(validated_results)} validated results from current batch "
         f"(filtered from {len(all_validated_results)} total history)"
     )
 
+    # Items were already validated by the validator nodes; optionally rebuild them
+    # without running Pydantic validation again
+    if settings.trust_validated_items:
+        build_box1, build_box3 = Box1Income.model_construct, Box3Asset.model_construct
+    else:
+        build_box1, build_box3 = Box1Income, Box3Asset
+
+    # Per-item log messages are only formatted when their level is enabled
+    info_enabled = logger.isEnabledFor(logging.INFO)
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    # Likewise, table rows and notes are only collected when the table is printed
+    render_table = settings.render_asset_tables
+
     all_box1_items = []
-    all_box3_items = []
+    new_assets: list[AssetMeta] = []
+    # Track which doc_ids are in the new batch to deduplicate existing items from the same documents
+    new_doc_ids: set[str] = set()
     all_errors = []
     all_warnings = []
     
@@ -54,127 +165,130 @@ def aggregate_extraction_node(state: TaxGraphState) -> dict:
     # This helps us distinguish between "value was 0.0" and "value was not provided (defaulted to 0.0)"
     extraction_map = {}
     for extraction_result in state.extraction_results:
+        # Only documents in the current batch are aggregated
+        if extraction_result.doc_id not in current_doc_ids:
+            continue
         extraction_map[extraction_result.doc_id] = extraction_result
 
     for result in validated_results:
-        doc_id = result.get("doc_id")
-        extraction_result = extraction_map.get(doc_id) if doc_id else None
-        
+        # Collect errors and warnings
+        all_errors.extend(result.get("validation_errors", []))
+        all_warnings.extend(result.get("validation_warnings", []))
+
         # Parse Box1 items
-        for item_dict in result.get("validated_box1_items", []):
-            all_box1_items.append(Box1Income(**item_dict))
+        all_box1_items.extend(
+            build_box1(**item_dict) for item_dict in result.get("validated_box1_items", [])
+        )
 
         # Parse Box3 items (will be merged later)
         # Store metadata about which values were actually extracted
-        for item_dict in result.get("validated_box3_items", []):
-            asset = Box3Asset(**item_dict)
+        box3_dicts = result.get("validated_box3_items")
+        if not box3_dicts:
+            # Nothing to match against the extraction (e.g. salary statements)
+            continue
+        doc_id = result.get("doc_id")
+        extraction_result = extraction_map.get(doc_id) if doc_id else None
+        if extraction_result:
+            # Indexed and parsed once per document
+            extracted_data = extraction_result.extracted_data
+            box3_index = _index_extracted_box3_items(extracted_data.get("box3_items", []))
+            # Document date range for merging priority
+            doc_date_range = extracted_data.get("document_date_range", {})
+            doc_start = _as_date(doc_date_range.get("start_date"))
+            doc_end = _as_date(doc_date_range.get("end_date"))
+        for item_dict in box3_dicts:
+            asset = build_box3(**item_dict)
+            new_doc_ids.add(asset.source_doc_id)
             # Check if this value was actually extracted (not defaulted)
             if extraction_result:
-                extracted_data = extraction_result.extracted_data
-                box3_items = extracted_data.get("box3_items", [])
-                
-                # Store document date range for merging priority
-                doc_date_range = extracted_data.get("document_date_range", {})
-                doc_start = doc_date_range.get("start_date")
-                doc_end = doc_date_range.get("end_date")
-                # Parse dates if they're strings
-                if doc_start and isinstance(doc_start, str):
-                    try:
-                        doc_start = datetime.fromisoformat(doc_start).date()
-                    except (ValueError, AttributeError):
-                        doc_start = None
-                if doc_end and isinstance(doc_end, str):
-                    try:
-                        doc_end = datetime.fromisoformat(doc_end).date()
-                    except (ValueError, AttributeError):
-                        doc_end = None
-                asset._doc_start_date = doc_start if isinstance(doc_start, date) else None
-                asset._doc_end_date = doc_end if isinstance(doc_end, date) else None
-                
                 # Find the matching item by account_number (preferred) or description and asset_type
-                for extracted_item in box3_items:
-                    # Match by account_number if available, otherwise by description
-                    matches = False
-                    if asset.account_number and extracted_item.get("account_number"):
-                        matches = (extracted_item.get("account_number") == asset.account_number and
-                                 extracted_item.get("asset_type") == asset.asset_type)
-                    elif not asset.account_number and not extracted_item.get("account_number"):
-                        matches = (extracted_item.get("description") == asset.description and
-                                 extracted_item.get("asset_type") == asset.asset_type)
-                    
-                    if matches:
-                        # Check if values were actually extracted (not None in raw extraction)
-                        asset._jan1_was_extracted = extracted_item.get("value_eur_jan1") is not None
-                        asset._dec31_was_extracted = extracted_item.get("value_eur_dec31") is not None
-                        break
+                if asset.account_number:
+                    item_key = ("account_number", asset.account_number, asset.asset_type)
+                else:
+                    item_key = ("description", asset.description, asset.asset_type)
+                extracted_item = box3_index.get(item_key)
+                
+                if extracted_item is not None:
+                    # Check if values were actually extracted (not None in raw extraction)
+                    new_assets.append(AssetMeta(
+                        asset,
+                        jan1_extracted=extracted_item.get("value_eur_jan1") is not None,
+                        dec31_extracted=extracted_item.get("value_eur_dec31") is not None,
+                        doc_start=doc_start,
+                        doc_end=doc_end,
+                    ))
                 else:
                     # If we can't find the item, assume both were extracted (conservative)
-                    asset._jan1_was_extracted = True
-                    asset._dec31_was_extracted = asset.value_eur_dec31 is not None
+                    new_assets.append(AssetMeta(
+                        asset,
+                        dec31_extracted=asset.value_eur_dec31 is not None,
+                        doc_start=doc_start,
+                        doc_end=doc_end,
+                    ))
             else:
                 # If we can't find extraction result, assume both were extracted (conservative)
-                asset._jan1_was_extracted = True
-                asset._dec31_was_extracted = asset.value_eur_dec31 is not None
-                asset._doc_start_date = None
-                asset._doc_end_date = None
-            
-            all_box3_items.append(asset)
-
-        # Collect errors and warnings
-        all_errors.extend(result.get("validation_errors", []))
-        all_warnings.extend(result.get("validation_warnings", []))
+                new_assets.append(AssetMeta(asset, dec31_extracted=asset.value_eur_dec31 is not None))
     
     # Merge Box3Asset items from the same account
     # Accounts are identified by account_number + asset_type (preferred) or description + asset_type (fallback)
     # IMPORTANT: Include existing items from state to prevent duplicates during incremental ingestion
-    account_map: dict[tuple[str, str, str], list[Box3Asset]] = defaultdict(list)
+    # Groups keep first-seen account order, so the output order is stable across runs
+    groups: dict[tuple[str, str, str], list[AssetMeta]] = {}
+    # Accounts with at least one asset from the new batch (key computed once per asset)
+    new_asset_keys = [_account_key(meta.asset) for meta in new_assets]
+    new_account_keys = set(new_asset_keys)
     
-    # Track which doc_ids are in the new batch to deduplicate existing items from the same documents
-    new_doc_ids = {asset.source_doc_id for asset in all_box3_items}
+    # Only accounts with new items are merged and returned, so a batch without Box3 items
+    # (e.g. only salary statements) skips grouping and merging entirely
+    existing_assets = state.box3_asset_items if new_assets else []
     
     # First, add existing items from state (for incremental ingestion deduplication)
     # But skip items from documents that are being reprocessed (to prevent duplicates)
-    for existing_asset in state.box3_asset_items:
+    for existing_asset in existing_assets:
         # Skip existing items from documents that are in the new batch (they'll be replaced)
         if existing_asset.source_doc_id in new_doc_ids:
-            logger.debug(
-                f"Skipping existing asset from doc {existing_asset.source_doc_id} "
-                f"({existing_asset.source_filename}) - document is being reprocessed"
-            )
+            if debug_enabled:
+                logger.debug(
+                    f"Skipping existing asset from doc {existing_asset.source_doc_id} "
+                    f"({existing_asset.source_filename}) - document is being reprocessed"
+                )
             continue
         
-        # Create a key: prefer account_number if available, otherwise use description
-        if existing_asset.account_number:
-            account_key = ("account_number", existing_asset.account_number, existing_asset.asset_type)
-        else:
-            account_key = ("description", existing_asset.description or "", existing_asset.asset_type)
-        account_map[account_key].append(existing_asset)
+        # Accounts without new items are left as they are in state
+        account_key = _account_key(existing_asset)
+        if account_key not in new_account_keys:
+            continue
+        
+        groups.setdefault(account_key, []).append(AssetMeta(existing_asset))
     
     # Then, add new items from validated_results
-    for asset in all_box3_items:
-        # Create a key: prefer account_number if available, otherwise use description
-        # Format: (match_type, identifier, asset_type) where match_type is "account_number" or "description"
-        if asset.account_number:
-            account_key = ("account_number", asset.account_number, asset.asset_type)
-        else:
-            # Fallback to description if account_number is not available
-            account_key = ("description", asset.description or "", asset.asset_type)
-        account_map[account_key].append(asset)
+    for account_key, meta in zip(new_asset_keys, new_assets):
+        groups.setdefault(account_key, []).append(meta)
     
     # Merge assets for each account
+    # IMPORTANT: Because box3_asset_items uses the 'add' operator, LangGraph will append
+    # the returned list to existing items. Only accounts that had new items were grouped
+    # above, so every merged item involves a new document and is returned as is:
+    # 1. New accounts (only new items)
+    # 2. Existing accounts that got new items (merged new + existing)
     merged_box3_items = []
+    # Source filenames of merged assets (all have both values), used below to drop
+    # validation errors that merging resolved
+    successfully_merged_files: set[str] = set()
     quarantined_assets = []
     # Collect asset information for table display
     asset_table_data = []
+    # Jan 1 of the tax year, the reference date for filled-in and merged values
+    jan1_of_tax_year = date(state.tax_year, 1, 1)
     
-    for account_key, assets in account_map.items():
+    for account_key, assets in groups.items():
         if len(assets) == 1:
+            meta = assets[0]
             # No merging needed - check if it has both values that were actually extracted
-            asset = assets[0]
+            asset = meta.asset
             # Check if values were actually extracted (not defaulted)
             # has_jan1: True if value was extracted AND value is not None
-            jan1_was_extracted = getattr(asset, '_jan1_was_extracted', True)  # Default to True if not set
-            has_jan1 = jan1_was_extracted and asset.value_eur_jan1 is not None
+            has_jan1 = meta.jan1_extracted and asset.value_eur_jan1 is not None
             # has_dec31: True if value exists (regardless of whether it was explicitly extracted)
             has_dec31 = asset.value_eur_dec31 is not None
             
@@ -185,79 +299,56 @@ def aggregate_extraction_node(state: TaxGraphState) -> dict:
             # If Jan 1 is missing but Dec 31 is present, account was opened mid-year - set Jan 1 to 0
             if not has_jan1 and has_dec31:
                 # Account was opened after January - Jan 1 value should be 0.0
-                doc_start = getattr(asset, '_doc_start_date', None)
-                asset_note = (
-                    f"Mid-year opening: Jan 1 not found but Dec 31 present"
-                    f"{f', doc starts {doc_start}' if doc_start else ''}"
-                )
-                # Create a new asset with Jan 1 set to 0.0 and reference_date set to tax year's Jan 1
-                tax_year = state.tax_year
-                asset = Box3Asset(
-                    source_doc_id=asset.source_doc_id,
-                    source_filename=asset.source_filename,
-                    source_page=asset.source_page,
-                    asset_type=asset.asset_type,
-                    value_eur_jan1=0.0,
-                    value_eur_dec31=asset.value_eur_dec31,
-                    realized_gains_eur=asset.realized_gains_eur,
-                    realized_losses_eur=asset.realized_losses_eur,
-                    original_value=asset.original_value,
-                    original_currency=asset.original_currency,
-                    conversion_rate=asset.conversion_rate,
-                    reference_date=date(tax_year, 1, 1),  # Jan 1 of tax year for the 0.0 value
-                    description=asset.description,
-                    account_number=asset.account_number,
-                    extraction_confidence=asset.extraction_confidence,
-                    original_text_snippet=asset.original_text_snippet,
-                )
+                if render_table:
+                    doc_start = meta.doc_start
+                    asset_note = (
+                        f"Mid-year opening: Jan 1 not found but Dec 31 present"
+                        f"{f', doc starts {doc_start}' if doc_start else ''}"
+                    )
+                # Copy with Jan 1 set to 0.0 and reference_date set to tax year's Jan 1
+                # (deposits/withdrawals are not carried over, as with the merged assets)
+                asset = asset.model_copy(update={
+                    "value_eur_jan1": 0.0,
+                    "deposits_eur": None,
+                    "withdrawals_eur": None,
+                    "reference_date": jan1_of_tax_year,  # Jan 1 of tax year for the 0.0 value
+                })
                 has_jan1 = True
             
             # Check for mid-year statement ending before Dec 31 (single asset case)
             # If Jan 1 is present but Dec 31 is missing, statement ends mid-year - set Dec 31 to 0
             if has_jan1 and not has_dec31:
                 # Statement doesn't cover Dec 31 - Dec 31 value should be 0.0
-                doc_end = getattr(asset, '_doc_end_date', None)
-                tax_year = state.tax_year
-                dec31_target = date(tax_year, 12, 31)
-                if asset_note:
-                    asset_note += "; "
-                asset_note += (
-                    f"Mid-year ending: Dec 31 not found"
-                    f"{f', doc ends {doc_end}' if doc_end else ''}"
-                )
-                # Create a new asset with Dec 31 set to 0.0
-                asset = Box3Asset(
-                    source_doc_id=asset.source_doc_id,
-                    source_filename=asset.source_filename,
-                    source_page=asset.source_page,
-                    asset_type=asset.asset_type,
-                    value_eur_jan1=asset.value_eur_jan1,
-                    value_eur_dec31=0.0,
-                    realized_gains_eur=asset.realized_gains_eur,
-                    realized_losses_eur=asset.realized_losses_eur,
-                    original_value=asset.original_value,
-                    original_currency=asset.original_currency,
-                    conversion_rate=asset.conversion_rate,
-                    reference_date=asset.reference_date,
-                    description=asset.description,
-                    account_number=asset.account_number,
-                    extraction_confidence=asset.extraction_confidence,
-                    original_text_snippet=asset.original_text_snippet,
-                )
+                if render_table:
+                    doc_end = meta.doc_end
+                    if asset_note:
+                        asset_note += "; "
+                    asset_note += (
+                        f"Mid-year ending: Dec 31 not found"
+                        f"{f', doc ends {doc_end}' if doc_end else ''}"
+                    )
+                # Copy with Dec 31 set to 0.0
+                asset = asset.model_copy(update={
+                    "value_eur_dec31": 0.0,
+                    "deposits_eur": None,
+                    "withdrawals_eur": None,
+                })
                 has_dec31 = True
             
             if has_jan1 and has_dec31:
                 merged_box3_items.append(asset)
+                successfully_merged_files.add(asset.source_filename)
                 # Collect data for table display
-                asset_table_data.append({
-                    "description": asset.description or "Unknown",
-                    "asset_type": asset.asset_type,
-                    "account_number": asset.account_number or "",
-                    "source_filename": asset.source_filename,
-                    "jan1": asset.value_eur_jan1,
-                    "dec31": asset.value_eur_dec31 or 0,
-                    "notes": asset_note,
-                })
+                if render_table:
+                    asset_table_data.append({
+                        "description": asset.description or "Unknown",
+                        "asset_type": asset.asset_type,
+                        "account_number": asset.account_number or "",
+                        "source_filename": asset.source_filename,
+                        "jan1": asset.value_eur_jan1,
+                        "dec31": asset.value_eur_dec31 or 0,
+                        "notes": asset_note,
+                    })
             else:
                 # Quarantine: missing required dates for actual return calculation
                 missing_dates = []
@@ -274,191 +365,192 @@ def aggregate_extraction_node(state: TaxGraphState) -> dict:
                 )
                 quarantined_assets.append((asset, quarantine_msg))
                 logger.warning(quarantine_msg)
-        else:
-            # Merge multiple assets for the same account
-            match_type = account_key[0]
-            identifier = account_key[1]
-            asset_type = account_key[2]
+        
+            continue
+        
+        # Merge multiple assets for the same account
+        if info_enabled:
+            match_type, identifier, asset_type = account_key
             logger.info(
                 f"Merging {len(assets)} Box3Asset items for account: "
                 f"{match_type}='{identifier}', asset_type='{asset_type}'"
             )
-            
-            # Use the first asset as the base
-            base_asset = assets[0]
-            
-            # Track notes for merged assets
-            merged_notes = []
-            
-            # Get tax year for reference date comparison
-            tax_year = state.tax_year
-            
-            # Find January-dated documents (doc_start or doc_end in January)
-            jan_documents = []
-            for a in assets:
-                doc_start = getattr(a, '_doc_start_date', None)
-                doc_end = getattr(a, '_doc_end_date', None)
-                doc_in_jan = False
-                if doc_start and doc_start.month == 1:
-                    doc_in_jan = True
-                elif doc_end and doc_end.month == 1:
-                    doc_in_jan = True
-                if doc_in_jan:
-                    jan_documents.append(a)
-            
-            # Find December-dated documents (doc_start or doc_end in December)
-            dec_documents = []
-            for a in assets:
-                doc_start = getattr(a, '_doc_start_date', None)
-                doc_end = getattr(a, '_doc_end_date', None)
-                doc_in_dec = False
-                if doc_start and doc_start.month == 12:
-                    doc_in_dec = True
-                elif doc_end and doc_end.month == 12:
-                    doc_in_dec = True
-                if doc_in_dec:
-                    dec_documents.append(a)
-            
-            # Extract Jan 1 value from January-dated documents (preferred) or from other documents with Jan 1 values
-            # This includes dec_prev_year documents (December statements of previous year used as Jan 1 value)
-            merged_jan1 = None
-            has_jan1 = False
-            if jan_documents:
-                # Look for Jan 1 value in January documents (preferred)
-                for a in jan_documents:
-                    if getattr(a, '_jan1_was_extracted', True) and a.value_eur_jan1 is not None:
-                        merged_jan1 = a.value_eur_jan1
-                        has_jan1 = True
-                        break
+        
+        # Use the first asset as the base
+        base_asset = assets[0].asset
+        display_name = base_asset.description or "Unknown"
+        
+        # Track notes for merged assets
+        merged_notes = []
+        
+        # Single pass over the group: find January/December-dated documents
+        # (doc_start or doc_end in that month), pick the Jan 1 / Dec 31 candidates
+        # and accumulate the combined values
+        has_jan_documents = False
+        has_dec_documents = False
+        # First extracted Jan 1 value from a January document and from any document
+        jan_doc_jan1 = None
+        any_doc_jan1 = None
+        # First extracted Dec 31 value from a December document
+        dec_doc_dec31 = None
+        has_dec31_value = False
+        total_gains = 0.0
+        total_losses = 0.0
+        min_confidence = math.inf
+        source_filenames: set[str] = set()
+        for m in assets:
+            a = m.asset
+            doc_start = m.doc_start
+            doc_end = m.doc_end
+            jan1 = a.value_eur_jan1 if m.jan1_extracted else None
+            if jan1 is not None and any_doc_jan1 is None:
+                any_doc_jan1 = jan1
+            if (doc_start and doc_start.month == 1) or (doc_end and doc_end.month == 1):
+                has_jan_documents = True
+                if jan1 is not None and jan_doc_jan1 is None:
+                    jan_doc_jan1 = jan1
+            dec31 = a.value_eur_dec31
+            if dec31 is not None:
+                has_dec31_value = True
+            if (doc_start and doc_start.month == 12) or (doc_end and doc_end.month == 12):
+                has_dec_documents = True
+                if dec31 is not None and m.dec31_extracted and dec_doc_dec31 is None:
+                    dec_doc_dec31 = dec31
+            gains = a.realized_gains_eur
+            if gains:
+                total_gains += gains
+            losses = a.realized_losses_eur
+            if losses:
+                total_losses += losses
+            confidence = a.extraction_confidence
+            if confidence < min_confidence:
+                min_confidence = confidence
+            source_filenames.add(a.source_filename)
+        # Sorted so the combined filename is deterministic
+        combined_filenames = ", ".join(sorted(source_filenames))
+        
+        # Extract Jan 1 value from January-dated documents (preferred) or from other documents with Jan 1 values
+        # This includes dec_prev_year documents (December statements of previous year used as Jan 1 value)
+        merged_jan1 = None
+        has_jan1 = False
+        if has_jan_documents:
+            # Use the Jan 1 value from January documents (preferred)
+            if jan_doc_jan1 is not None:
+                merged_jan1 = jan_doc_jan1
+                has_jan1 = True
+            else:
                 # If not found but we have January documents, assume 0
-                if not has_jan1:
-                    merged_jan1 = 0.0
-                    has_jan1 = True
+                merged_jan1 = 0.0
+                has_jan1 = True
+                if info_enabled:
                     logger.info(
-                        f"No Jan 1 value found in January documents for {base_asset.description or 'Unknown'} "
+                        f"No Jan 1 value found in January documents for {display_name} "
                         f"({base_asset.asset_type}), assuming 0.0"
                     )
-            else:
-                # No January documents found - check all assets for Jan 1 values
-                # This handles cases like dec_prev_year documents (December of previous year used as Jan 1)
-                for a in assets:
-                    if getattr(a, '_jan1_was_extracted', True) and a.value_eur_jan1 is not None:
-                        merged_jan1 = a.value_eur_jan1
-                        has_jan1 = True
-                        logger.info(
-                            f"Found Jan 1 value from non-January document for {base_asset.description or 'Unknown'} "
-                            f"({base_asset.asset_type}) - likely from December statement of previous year"
-                        )
-                        break
-                
-                if not has_jan1:
-                    # Check if this is a mid-year account opening scenario
-                    # If we have Dec 31 data but no Jan 1 data, account was opened mid-year
-                    # In this case, Jan 1 value should be 0.0 (account didn't exist on Jan 1)
-                    # Check if any asset has a Dec 31 value
-                    has_dec31_value = any(a.value_eur_dec31 is not None for a in assets)
-                    if has_dec31_value:
-                        # Account was opened after January - Jan 1 value should be 0.0
-                        merged_jan1 = 0.0
-                        has_jan1 = True
-                        merged_notes.append("Mid-year opening: Jan 1 not found but Dec 31 present")
-                    else:
-                        # No Jan 1 value found in any document - cannot determine Jan 1 value
-                        logger.warning(
-                            f"No January-dated documents or Jan 1 values found for {base_asset.description or 'Unknown'} "
-                            f"({base_asset.asset_type}), cannot determine Jan 1 value"
-                        )
+        else:
+            # No January documents found - check all assets for Jan 1 values
+            # This handles cases like dec_prev_year documents (December of previous year used as Jan 1)
+            if any_doc_jan1 is not None:
+                merged_jan1 = any_doc_jan1
+                has_jan1 = True
+                if info_enabled:
+                    logger.info(
+                        f"Found Jan 1 value from non-January document for {display_name} "
+                        f"({base_asset.asset_type}) - likely from December statement of previous year"
+                    )
             
-            # Extract Dec 31 value from December-dated documents only
-            merged_dec31 = None
-            has_dec31 = False
-            if dec_documents:
-                # Look for Dec 31 value in December documents
-                for a in dec_documents:
-                    if a.value_eur_dec31 is not None and getattr(a, '_dec31_was_extracted', True):
-                        merged_dec31 = a.value_eur_dec31
-                        has_dec31 = True
-                        break
+            if not has_jan1:
+                # Check if this is a mid-year account opening scenario
+                # If we have Dec 31 data but no Jan 1 data, account was opened mid-year
+                # In this case, Jan 1 value should be 0.0 (account didn't exist on Jan 1)
+                # Check if any asset has a Dec 31 value
+                if has_dec31_value:
+                    # Account was opened after January - Jan 1 value should be 0.0
+                    merged_jan1 = 0.0
+                    has_jan1 = True
+                    merged_notes.append("Mid-year opening: Jan 1 not found but Dec 31 present")
+                else:
+                    # No Jan 1 value found in any document - cannot determine Jan 1 value
+                    logger.warning(
+                        f"No January-dated documents or Jan 1 values found for {display_name} "
+                        f"({base_asset.asset_type}), cannot determine Jan 1 value"
+                    )
+        
+        # Extract Dec 31 value from December-dated documents only
+        merged_dec31 = None
+        has_dec31 = False
+        if has_dec_documents:
+            # Use the Dec 31 value from December documents
+            if dec_doc_dec31 is not None:
+                merged_dec31 = dec_doc_dec31
+                has_dec31 = True
+            else:
                 # If not found but we have December documents, assume 0
-                if not has_dec31:
-                    merged_dec31 = 0.0
-                    has_dec31 = True
+                merged_dec31 = 0.0
+                has_dec31 = True
+                if info_enabled:
                     logger.info(
-                        f"No Dec 31 value found in December documents for {base_asset.description or 'Unknown'} "
+                        f"No Dec 31 value found in December documents for {display_name} "
                         f"({base_asset.asset_type}), assuming 0.0"
                     )
+        else:
+            # No December documents found - check if this is a mid-year statement ending before Dec 31
+            if has_jan1:
+                # If we have Jan 1 data but no Dec 31 data, statement ends mid-year - set Dec 31 to 0
+                merged_dec31 = 0.0
+                has_dec31 = True
+                merged_notes.append("Mid-year ending: Dec 31 not found")
             else:
-                # No December documents found - check if this is a mid-year statement ending before Dec 31
-                if has_jan1:
-                    # If we have Jan 1 data but no Dec 31 data, statement ends mid-year - set Dec 31 to 0
-                    merged_dec31 = 0.0
-                    has_dec31 = True
-                    merged_notes.append("Mid-year ending: Dec 31 not found")
-                else:
-                    # No December documents found - cannot determine Dec 31 value
-                    logger.warning(
-                        f"No December-dated documents found for {base_asset.description or 'Unknown'} "
-                        f"({base_asset.asset_type}), cannot determine Dec 31 value"
-                    )
-            
-            # Quarantine if we don't have both values from appropriate documents
-            if not (has_jan1 and has_dec31):
-                missing_dates = []
-                if not has_jan1:
-                    missing_dates.append("January 1st")
-                if not has_dec31:
-                    missing_dates.append("December 31st")
-                
-                all_source_filenames = [a.source_filename for a in assets]
-                quarantine_msg = (
-                    f"Box3Asset for account '{base_asset.description or 'Unknown'}' "
-                    f"({base_asset.asset_type}) from merged documents "
-                    f"({', '.join(set(all_source_filenames))}) is missing "
-                    f"values for {', '.join(missing_dates)}. "
-                    f"Both Jan 1 and Dec 31 values are required for actual return calculation."
+                # No December documents found - cannot determine Dec 31 value
+                logger.warning(
+                    f"No December-dated documents found for {display_name} "
+                    f"({base_asset.asset_type}), cannot determine Dec 31 value"
                 )
-                quarantined_assets.append((base_asset, quarantine_msg))
-                logger.warning(quarantine_msg)
-                continue  # Skip adding to merged_box3_items
-            
-            # Combine realized gains/losses (sum them)
-            total_gains = sum(a.realized_gains_eur or 0.0 for a in assets)
-            total_losses = sum(a.realized_losses_eur or 0.0 for a in assets)
-            
-            # Combine source documents (keep track of all source doc IDs)
-            all_source_doc_ids = [a.source_doc_id for a in assets]
-            all_source_filenames = [a.source_filename for a in assets]
-            
-            # Create merged asset
-            # Use Jan 1 of tax year as the reference_date for merged assets
-            merged_reference_date = date(tax_year, 1, 1)
+        
+        # Quarantine if we don't have both values from appropriate documents
+        if not (has_jan1 and has_dec31):
+            missing_dates = []
+            if not has_jan1:
+                missing_dates.append("January 1st")
+            if not has_dec31:
+                missing_dates.append("December 31st")
             
-            merged_asset = Box3Asset(
-                source_doc_id=base_asset.source_doc_id,  # Use first doc_id as primary
-                source_filename=", ".join(set(all_source_filenames)),  # Combine filenames
-                source_page=base_asset.source_page,
-                asset_type=base_asset.asset_type,
-                value_eur_jan1=merged_jan1,
-                value_eur_dec31=merged_dec31,
-                realized_gains_eur=total_gains if total_gains > 0 else None,
-                realized_losses_eur=total_losses if total_losses > 0 else None,
-                original_value=base_asset.original_value,
-                original_currency=base_asset.original_currency,
-                conversion_rate=base_asset.conversion_rate,
-                reference_date=merged_reference_date,  # Always use Jan 1 for merged assets
-                description=base_asset.description,
-                account_number=base_asset.account_number,  # Preserve account_number from base asset
-                extraction_confidence=min(a.extraction_confidence for a in assets),  # Use lowest confidence
-                original_text_snippet=base_asset.original_text_snippet,
+            quarantine_msg = (
+                f"Box3Asset for account '{display_name}' "
+                f"({base_asset.asset_type}) from merged documents "
+                f"({combined_filenames}) is missing "
+                f"values for {', '.join(missing_dates)}. "
+                f"Both Jan 1 and Dec 31 values are required for actual return calculation."
             )
-            
-            merged_box3_items.append(merged_asset)
-            # Collect data for table display
+            quarantined_assets.append((base_asset, quarantine_msg))
+            logger.warning(quarantine_msg)
+            continue  # Skip adding to merged_box3_items
+        
+        # Create merged asset
+        # Copy the (already validated) base asset and override the merged fields,
+        # rather than re-validating every field through the constructor
+        merged_asset = base_asset.model_copy(update={
+            "source_filename": combined_filenames,  # Combine filenames
+            "value_eur_jan1": merged_jan1,
+            "value_eur_dec31": merged_dec31,
+            "realized_gains_eur": total_gains if total_gains > 0 else None,
+            "realized_losses_eur": total_losses if total_losses > 0 else None,
+            # Deposits/withdrawals of the base document alone are not carried over
+            "deposits_eur": None,
+            "withdrawals_eur": None,
+            "reference_date": jan1_of_tax_year,  # Always use Jan 1 for merged assets
+            "extraction_confidence": min_confidence,  # Use lowest confidence
+        })
+        
+        merged_box3_items.append(merged_asset)
+        successfully_merged_files.update(source_filenames)
+        # Collect data for table display
+        if render_table:
             notes_str = "; ".join(merged_notes) if merged_notes else "Merged"
             asset_table_data.append({
-                "description": merged_asset.description or "Unknown",
-                "asset_type": merged_asset.asset_type,
-                "account_number": merged_asset.account_number or "",
+                "description": display_name,
+                "asset_type": base_asset.asset_type,
+                "account_number": base_asset.account_number or "",
                 "source_filename": f"{len(assets)} documents",
                 "jan1": merged_jan1,
                 "dec31": merged_dec31 or 0,
@@ -474,56 +566,44 @@ def aggregate_extraction_node(state: TaxGraphState) -> dict:
             f"for actual return calculation"
         )
     
-    all_box3_items = merged_box3_items
-
     # After merging, remove validation errors that were resolved by aggregation
     # These are errors about missing Jan 1 or Dec 31 values that were filled in during merging
     resolved_errors = []
-    remaining_errors = []
-    
-    # Build a set of all source filenames from successfully merged assets with both values
-    # Note: merged assets may have comma-separated filenames, so we need to check all of them
-    successfully_merged_files = set()
-    for asset in merged_box3_items:
-        if asset.value_eur_jan1 is not None and asset.value_eur_dec31 is not None:
-            # Split comma-separated filenames and add each one
-            filenames = [f.strip() for f in asset.source_filename.split(",")]
-            successfully_merged_files.update(filenames)
     
     # Filter out errors about missing values for files that were successfully merged
-    for error in all_errors:
-        # Check if this is a Box3 validation error about missing values
-        if "Box3 validation error" in error and "must have at least one of value_eur_jan1 or value_eur_dec31" in error:
-            # Extract filename from error message
+    # (nothing to resolve if no asset was merged)
+    if successfully_merged_files:
+        remaining_errors = []
+        for error in all_errors:
+            # Check if this is a Box3 validation error about missing values
             # Error format: "Box3 validation error in {filename}: ..."
-            if " in " in error:
-                filename = error.split(" in ", 1)[1].split(":", 1)[0].strip()
-                if filename in successfully_merged_files:
-                    # This error was resolved by merging - remove it
-                    resolved_errors.append(error)
-                    continue
-        
-        # Keep all other errors
-        remaining_errors.append(error)
+            match = _MISSING_VALUES_ERROR_RE.match(error)
+            if match and match.group("filename").strip() in successfully_merged_files:
+                # This error was resolved by merging - remove it
+                resolved_errors.append(error)
+                continue
+            
+            # Keep all other errors
+            remaining_errors.append(error)
+        all_errors = remaining_errors
     
     if resolved_errors:
         logger.info(
             f"Resolved {len(resolved_errors)} validation error(s) through aggregation: "
             f"missing values were filled in by merging documents"
         )
-        for error in resolved_errors:
-            logger.debug(f"Resolved error: {error}")
-    
-    all_errors = remaining_errors
+        if debug_enabled:
+            for error in resolved_errors:
+                logger.debug(f"Resolved error: {error}")
 
     logger.info(
         f"Aggregated: {len(all_box1_items)} Box1 items, "
-        f"{len(all_box3_items)} Box3 items (after merging and quarantine), "
+        f"{len(merged_box3_items)} Box3 items (after merging and quarantine), "
         f"{len(quarantined_assets)} Box3 items quarantined (missing required dates), "
         f"{len(all_errors)} errors"
     )
 
-    # Display assets in a table format
+    # Display assets in a table format (empty for headless runs)
     if asset_table_data:
         table = Table(title="Box 3 Assets", show_header=True, header_style="bold magenta")
         table.add_column("Description", style="cyan", no_wrap=False)
@@ -558,14 +638,17 @@ def aggregate_extraction_node(state: TaxGraphState) -> dict:
     # Note: Parser agents received data via Send objects, not from state, so we can safely clear:
     # - documents: Full scrubbed document text
     # - classified_documents: Contains doc_text that was only needed for routing
-    doc_count = len(state.documents)
-    doc_chars = sum(len(doc.scrubbed_text) for doc in state.documents)
-    classified_count = len(state.classified_documents)
-    classified_chars = sum(
-        len(doc.get("doc_text", "")) for doc in state.classified_documents
-    )
+    classified_documents = state.classified_documents
+    doc_count = len(documents)
+    classified_count = len(classified_documents)
     
-    if doc_count > 0 or classified_count > 0:
+    # Character totals are only needed for the log line
+    if (doc_count > 0 or classified_count > 0) and info_enabled:
+        # char_count is recorded at scrubbing time, so no need to measure the text again
+        doc_chars = sum(doc.char_count for doc in documents)
+        classified_chars = sum(
+            len(doc.get("doc_text", "")) for doc in classified_documents
+        )
         total_chars = doc_chars + classified_chars
         logger.info(
             f"Clearing {doc_count} documents and {classified_count} classified entries "
@@ -573,41 +656,17 @@ def aggregate_extraction_node(state: TaxGraphState) -> dict:
             f"Structured data retained."
         )
 
-    # IMPORTANT: Because box3_asset_items uses the 'add' operator, LangGraph will append
-    # the returned list to existing items. We've already merged new items with existing
-    # items in account_map, so we need to return ONLY items that involve new documents.
-    # 
-    # Strategy: Return only merged items from accounts that had new items.
-    # This includes:
-    # 1. New accounts (only new items)
-    # 2. Existing accounts that got new items (merged new + existing)
-    items_to_return = []
-    for merged_item in merged_box3_items:
-        # Determine the account key for this merged item
-        if merged_item.account_number:
-            item_account_key = ("account_number", merged_item.account_number, merged_item.asset_type)
-        else:
-            item_account_key = ("description", merged_item.description or "", merged_item.asset_type)
-        
-        # Check if this account had any new items (from new_doc_ids)
-        account_assets = account_map.get(item_account_key, [])
-        has_new_items = any(asset.source_doc_id in new_doc_ids for asset in account_assets)
-        
-        if has_new_items:
-            # This account has new items - return the merged result
-            # (either new account or merged with existing)
-            items_to_return.append(merged_item)
-    
     logger.info(
-        f"Returning {len(items_to_return)} Box3 items (from {len(merged_box3_items)} merged items, "
-        f"{len(new_doc_ids)} new documents)"
+        f"Returning {len(merged_box3_items)} Box3 items for {len(new_account_keys)} touched accounts "
+        f"({len(new_doc_ids)} new documents)"
     )
     
     return {
         "box1_income_items": all_box1_items,
-        "box3_asset_items": items_to_return,  # Return only new/merged items, not existing ones
-        "validation_errors": list(state.validation_errors) + all_errors,
-        "validation_warnings": list(state.validation_warnings) + all_warnings,
+        "box3_asset_items": merged_box3_items,  # Return only new/merged items, not existing ones
+        # validation_errors/warnings have no reducer, so the full lists are returned
+        "validation_errors": [*state.validation_errors, *all_errors],
+        "validation_warnings": [*state.validation_warnings, *all_warnings],
         "status": "validating",
         "documents": [],  # Clear to save memory and tokens
         "classified_documents": [],  # Clear classified_documents.doc_text as well
@@ -3,13 +3,12 @@
 This module contains both the LangGraph node and the calculation logic.
 """
 
-import json
 import logging
 
-from dutch_tax_agent.config import settings
 from dutch_tax_agent.graph.nodes.box3.optimization import optimize_partner_allocation
 from dutch_tax_agent.schemas.state import TaxGraphState
 from dutch_tax_agent.schemas.tax_entities import Box3Asset, Box3Calculation
+from dutch_tax_agent.tools.box3_rates import load_all_rates
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +30,7 @@ def calculate_actual_return(
     logger.info(f"Calculating Box 3 using Actual Return method for {tax_year}")
 
     # Load rates for tax-free allowance and tax rate
-    rates_path = settings.data_dir / "box3_rates_2022_2025.json"
-    with open(rates_path, "r") as f:
-        all_rates = json.load(f)
+    all_rates = load_all_rates()
 
     rates = all_rates[str(tax_year)]
 
@@ -15,13 +15,12 @@ Solution: Implement "Smart Cap" for 2025 that prevents Partner B's income from
 exceeding the pivot threshold.
 """
 
-import json
 import logging
 from typing import Optional
 
-from dutch_tax_agent.config import settings
 from dutch_tax_agent.schemas.state import TaxGraphState
 from dutch_tax_agent.schemas.tax_entities import Box3Calculation
+from dutch_tax_agent.tools.box3_rates import load_all_rates
 from dutch_tax_agent.tools.tax_credits import get_general_tax_credit
 
 logger = logging.getLogger(__name__)
@@ -53,9 +52,7 @@ def optimize_partner_allocation(
     optimized_result = statutory_result.model_copy(deep=True)
     
     # Load AHK parameters for pivot threshold check (2025)
-    rates_path = settings.data_dir / "box3_rates_2022_2025.json"
-    with open(rates_path, "r") as f:
-        all_rates = json.load(f)
+    all_rates = load_all_rates()
     
     if str(tax_year) not in all_rates:
         logger.warning(f"No rates for {tax_year}. Skipping optimization.")
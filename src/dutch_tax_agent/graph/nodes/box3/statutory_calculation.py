@@ -7,23 +7,20 @@ This module implements:
 For 2022, it automatically calculates both and selects the most favorable one.
 """
 
-import json
 import logging
 from typing import Optional
 
-from dutch_tax_agent.config import settings
 from dutch_tax_agent.graph.nodes.box3.optimization import optimize_partner_allocation
 from dutch_tax_agent.schemas.state import TaxGraphState
 from dutch_tax_agent.schemas.tax_entities import Box3Asset, Box3Calculation
+from dutch_tax_agent.tools.box3_rates import load_all_rates
 
 logger = logging.getLogger(__name__)
 
 
 def load_rates(tax_year: int) -> dict:
     """Load Box 3 rates for a specific tax year."""
-    rates_path = settings.data_dir / "box3_rates_2022_2025.json"
-    with open(rates_path, "r") as f:
-        all_rates = json.load(f)
+    all_rates = load_all_rates()
     
     year_str = str(tax_year)
     if year_str not in all_rates:
@@ -6,6 +6,7 @@ from langchain_core.messages import HumanMessage
 from langgraph.graph import END
 from langgraph.types import Command, Send
 
+from dutch_tax_agent.config import settings
 from dutch_tax_agent.llm_factory import create_llm
 from dutch_tax_agent.schemas.documents import DocumentClassification
 from dutch_tax_agent.schemas.state import TaxGraphState
@@ -13,24 +14,8 @@ from dutch_tax_agent.schemas.state import TaxGraphState
 logger = logging.getLogger(__name__)
 
 
-def classify_document(doc_text: str, doc_id: str, tax_year: int | None = None) -> DocumentClassification:
-    """Classify a document to determine which parser agent to use and extract tax year.
-    
-    Args:
-        doc_text: Scrubbed document text
-        doc_id: Document ID
-        tax_year: Tax year being processed (used to distinguish dec_period from dec_prev_year)
-        
-    Returns:
-        DocumentClassification with type, confidence, and tax year
-    """
-    llm = create_llm(temperature=0)
-
-    tax_year_context = ""
-    if tax_year is not None:
-        tax_year_context = f"\n\nIMPORTANT CONTEXT: The tax year being processed is {tax_year}. Use this to distinguish between dec_period (Dec {tax_year}) and dec_prev_year (Dec {tax_year - 1})."
-
-    prompt = f"""Classify this financial document and extract the tax year.
+# Prompt template for document classification (formatted with tax_year_context and doc_excerpt)
+_CLASSIFICATION_PROMPT = """Classify this financial document and extract the tax year.
 
 First, classify into ONE of these categories:
 - dutch_bank_statement: Dutch bank statement (ING, ABN AMRO, Rabobank, etc.)
@@ -73,7 +58,7 @@ IMPORTANT: To distinguish between dec_period and dec_prev_year:
 {tax_year_context}
 
 Document text (first 1000 chars):
-{doc_text[:1000]}
+{doc_excerpt}
 
 Respond with FOUR values separated by commas:
 1. Category name
@@ -88,9 +73,50 @@ Example: crypto_broker_statement,0.85,2024,jan_period
 Example if year unclear: us_broker_statement,0.90,null,full_year
 """
 
+
+def _build_classification_prompt(doc_text: str, tax_year: int | None = None) -> str:
+    """Build the classification prompt for a single document.
+    
+    Args:
+        doc_text: Scrubbed document text
+        tax_year: Tax year being processed (used to distinguish dec_period from dec_prev_year)
+        
+    Returns:
+        Prompt text for the classification LLM call
+    """
+    tax_year_context = ""
+    if tax_year is not None:
+        tax_year_context = f"\n\nIMPORTANT CONTEXT: The tax year being processed is {tax_year}. Use this to distinguish between dec_period (Dec {tax_year}) and dec_prev_year (Dec {tax_year - 1})."
+
+    return _CLASSIFICATION_PROMPT.format(
+        tax_year_context=tax_year_context, doc_excerpt=doc_text[:1000]
+    )
+
+
+def _failed_classification(doc_id: str, error: Exception) -> DocumentClassification:
+    """Build the fallback classification used when classifying a document fails."""
+    logger.error(f"Failed to classify document {doc_id}: {error}")
+    return DocumentClassification(
+        doc_id=doc_id,
+        doc_type="unknown",
+        confidence=0.0,
+        reasoning=f"Classification failed: {error}",
+        tax_year=None,
+    )
+
+
+def _parse_classification(response_text: str, doc_id: str) -> DocumentClassification:
+    """Parse the comma-separated classification LLM response.
+    
+    Args:
+        response_text: Raw LLM response text
+        doc_id: Document ID
+        
+    Returns:
+        DocumentClassification with type, confidence, and tax year
+    """
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        response_text = response.content.strip()
+        response_text = response_text.strip()
 
         # Parse response
         parts = [p.strip() for p in response_text.split(",")]
@@ -170,14 +196,60 @@ Example if year unclear: us_broker_statement,0.90,null,full_year
         )
 
     except Exception as e:
-        logger.error(f"Failed to classify document {doc_id}: {e}")
-        return DocumentClassification(
-            doc_id=doc_id,
-            doc_type="unknown",
-            confidence=0.0,
-            reasoning=f"Classification failed: {e}",
-            tax_year=None,
-        )
+        return _failed_classification(doc_id, e)
+
+
+def classify_document(doc_text: str, doc_id: str, tax_year: int | None = None) -> DocumentClassification:
+    """Classify a document to determine which parser agent to use and extract tax year.
+    
+    Args:
+        doc_text: Scrubbed document text
+        doc_id: Document ID
+        tax_year: Tax year being processed (used to distinguish dec_period from dec_prev_year)
+        
+    Returns:
+        DocumentClassification with type, confidence, and tax year
+    """
+    return classify_documents([(doc_id, doc_text)], tax_year=tax_year)[0]
+
+
+def classify_documents(
+    docs: list[tuple[str, str]], tax_year: int | None = None
+) -> list[DocumentClassification]:
+    """Classify several documents with concurrent LLM requests.
+    
+    llm.batch() sends one request per document from a thread pool, so the
+    round trips overlap instead of running one after another. At most
+    MAX_PARALLEL_DOCS requests are in flight at once, so a large upload does
+    not hit provider rate limits all at once.
+    
+    Args:
+        docs: List of (doc_id, doc_text) tuples
+        tax_year: Tax year being processed (used to distinguish dec_period from dec_prev_year)
+        
+    Returns:
+        DocumentClassification for each document, in input order
+    """
+    if not docs:
+        return []
+
+    llm = create_llm(temperature=0, use_cache=True)
+    responses = llm.batch(
+        [
+            [HumanMessage(content=_build_classification_prompt(doc_text, tax_year))]
+            for _, doc_text in docs
+        ],
+        config={"max_concurrency": settings.max_parallel_docs},
+        return_exceptions=True,
+    )
+
+    classifications = []
+    for (doc_id, _), response in zip(docs, responses):
+        if isinstance(response, Exception):
+            classifications.append(_failed_classification(doc_id, response))
+        else:
+            classifications.append(_parse_classification(response.content, doc_id))
+    return classifications
 
 
 def dispatcher_node(state: TaxGraphState) -> Command:
@@ -220,6 +292,7 @@ def dispatcher_node(state: TaxGraphState) -> Command:
         f"Found {len(already_classified_doc_ids)} already classified documents: {already_classified_doc_ids}"
     )
 
+    new_docs = []
     for doc in state.documents:
         # Skip documents that have already been classified
         # This prevents duplicate LLM calls when dispatcher is called multiple times
@@ -230,10 +303,16 @@ def dispatcher_node(state: TaxGraphState) -> Command:
             continue
         
         logger.info(f"Processing new document: {doc.doc_id} ({doc.filename})")
+        new_docs.append(doc)
+
+    # Classify all new documents concurrently (includes type and tax year extraction)
+    # Pass tax_year to help distinguish between dec_period and dec_prev_year
+    classifications = classify_documents(
+        [(doc.doc_id, doc.scrubbed_text) for doc in new_docs],
+        tax_year=state.tax_year,
+    )
 
-        # Classify the document (includes type and tax year extraction)
-        # Pass tax_year to help distinguish between dec_period and dec_prev_year
-        classification = classify_document(doc.scrubbed_text, doc.doc_id, tax_year=state.tax_year)
+    for doc, classification in zip(new_docs, classifications):
 
         # Check if tax year matches
         tax_year_mismatch = False
@@ -70,7 +70,11 @@ def validator_node(state: TaxGraphState) -> dict:
         validated_box1_items = []
         validated_box3_items = []
         validation_errors = []
-        validation_warnings = []
+        # Parser warnings (e.g. a skipped extraction) are shown to the user with the others
+        validation_warnings = [
+            f"Extraction warning for {source_filename}: {warning}"
+            for warning in extraction_result.warnings
+        ]
         
         # Extract the structured data
         extracted_data = extraction_result.extracted_data
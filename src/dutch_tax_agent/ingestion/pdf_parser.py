@@ -74,8 +74,8 @@ class PDFParser:
                             f"Page {page_num} of {pdf_path.name} has no extractable text"
                         )
 
-                # Combine all pages
-                combined_text = "\n\n".join(full_text)
+                # Combine all pages (form feed keeps page boundaries recoverable)
+                combined_text = "\n\f\n".join(full_text)
                 char_count = len(combined_text)
 
                 # Validate minimum character count
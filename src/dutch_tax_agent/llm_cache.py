@@ -0,0 +1,78 @@
+"""Persistent LLM response cache backed by SQLite."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain LLM cache storing response texts in a local SQLite database.
+
+    Re-running the graph on the same (scrubbed) documents returns the stored
+    responses instead of paying for the same LLM calls again. Entries are
+    keyed on a hash of the serialized prompt and the model parameters, so a
+    changed prompt or model is a cache miss.
+
+    A new connection is opened per operation so the cache can be shared by
+    parser nodes running in parallel threads.
+    """
+
+    def __init__(self, database_path: Path) -> None:
+        """Initialize the cache, creating the database if needed.
+
+        Args:
+            database_path: Path to the SQLite cache database
+        """
+        self.database_path = Path(database_path).expanduser().resolve()
+        self.database_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.database_path, timeout=30)
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        """Return cached generations for a prompt, or None on a miss."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?",
+                (self._key(prompt, llm_string),),
+            ).fetchone()
+        if row is None:
+            return None
+        logger.debug("LLM cache hit")
+        return [
+            ChatGeneration(message=AIMessage(content=text))
+            for text in json.loads(row[0])
+        ]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store the generations returned for a prompt."""
+        texts = [generation.text for generation in return_val]
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)",
+                (self._key(prompt, llm_string), json.dumps(texts)),
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove all cached responses."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM llm_cache")
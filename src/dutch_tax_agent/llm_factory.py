@@ -1,19 +1,58 @@
 """LLM factory for creating LLM instances based on provider configuration."""
 
 import logging
+from functools import lru_cache
+from pathlib import Path
 
 from langchain_core.language_models import BaseChatModel
 
 from dutch_tax_agent.config import settings
+from dutch_tax_agent.llm_cache import SQLiteLLMCache
 
 logger = logging.getLogger(__name__)
 
 
-def create_llm(temperature: float = 0) -> BaseChatModel:
+@lru_cache(maxsize=4)
+def _get_response_cache(database_path: Path) -> SQLiteLLMCache:
+    """Return the shared response cache for a database path."""
+    logger.info(f"Using LLM response cache: {database_path}")
+    return SQLiteLLMCache(database_path)
+
+
+def clear_response_cache() -> None:
+    """Delete all stored LLM responses from the configured cache database.
+    
+    Runs whether or not the cache is currently enabled, so responses stored
+    while it was enabled do not outlive the documents they came from.
+    """
+    if not settings.llm_cache_db_path.expanduser().exists():
+        return
+    _get_response_cache(settings.llm_cache_db_path).clear()
+    logger.info(f"Cleared LLM response cache: {settings.llm_cache_db_path}")
+
+
+def create_llm(
+    temperature: float = 0,
+    json_mode: bool = False,
+    use_cache: bool = False,
+    model: str | None = None,
+) -> BaseChatModel:
     """Create an LLM instance based on the configured provider.
     
+    Instances are cached per configuration so the parser agents share one
+    client (and its HTTP connection pool) instead of building a new one per
+    document. Chat models are stateless per call, so sharing is safe across
+    the parallel parser nodes.
+    
     Args:
         temperature: Temperature setting for the LLM (default: 0)
+        json_mode: Constrain decoding to a single valid JSON object using the
+            provider's native JSON mode (default: False)
+        use_cache: Serve repeated identical prompts from the persistent response
+            cache, if enabled in settings. Only meant for deterministic calls
+            (default: False)
+        model: Model name overriding the configured LLM_MODEL, e.g. a smaller
+            model for structured extraction (default: None)
         
     Returns:
         BaseChatModel instance (ChatOpenAI or ChatOllama)
@@ -21,28 +60,57 @@ def create_llm(temperature: float = 0) -> BaseChatModel:
     Raises:
         ValueError: If provider is not supported or configuration is invalid
     """
-    provider = settings.llm_provider.lower()
-    
-    # Determine model name
-    model_name = settings.llm_model.strip() if settings.llm_model else None
-    
+    model_name = model or settings.llm_model
+    # Settings are part of the cache key so configuration changes are picked up
+    return _create_llm_cached(
+        settings.llm_provider.lower(),
+        model_name.strip() if model_name else None,
+        settings.openai_model,
+        settings.openai_api_key,
+        settings.ollama_base_url,
+        temperature,
+        json_mode,
+        settings.llm_cache_db_path if use_cache and settings.enable_llm_cache else None,
+    )
+
+
+@lru_cache(maxsize=8)
+def _create_llm_cached(
+    provider: str,
+    model_name: str | None,
+    openai_model: str,
+    openai_api_key: str,
+    ollama_base_url: str,
+    temperature: float,
+    json_mode: bool,
+    cache_db_path: Path | None,
+) -> BaseChatModel:
+    """Build an LLM instance for a resolved configuration (cached by create_llm)."""
+    # None falls back to the global LangChain cache, which is unset by default
+    cache = _get_response_cache(cache_db_path) if cache_db_path is not None else None
+
     if provider == "openai":
         from langchain_openai import ChatOpenAI
         
         # Use llm_model if set, otherwise fall back to openai_model for backward compatibility
-        model = model_name or settings.openai_model
+        model = model_name or openai_model
         
-        if not settings.openai_api_key:
+        if not openai_api_key:
             logger.warning(
                 "OPENAI_API_KEY not set. LLM calls may fail. "
                 "Set OPENAI_API_KEY environment variable."
             )
         
-        logger.info(f"Creating OpenAI LLM with model: {model}, temperature: {temperature}")
+        logger.info(
+            f"Creating OpenAI LLM with model: {model}, temperature: {temperature}, "
+            f"json_mode: {json_mode}"
+        )
         return ChatOpenAI(
             model=model,
             temperature=temperature,
-            api_key=settings.openai_api_key or None,
+            api_key=openai_api_key or None,
+            model_kwargs={"response_format": {"type": "json_object"}} if json_mode else {},
+            cache=cache,
         )
     
     elif provider == "ollama":
@@ -59,12 +127,15 @@ def create_llm(temperature: float = 0) -> BaseChatModel:
         
         logger.info(
             f"Creating Ollama LLM with model: {model}, "
-            f"base_url: {settings.ollama_base_url}, temperature: {temperature}"
+            f"base_url: {ollama_base_url}, temperature: {temperature}, "
+            f"json_mode: {json_mode}"
         )
         return ChatOllama(
             model=model,
-            base_url=settings.ollama_base_url,
+            base_url=ollama_base_url,
             temperature=temperature,
+            format="json" if json_mode else None,
+            cache=cache,
         )
     
     else:
@@ -72,4 +143,3 @@ def create_llm(temperature: float = 0) -> BaseChatModel:
             f"Unsupported LLM provider: {provider}. "
             f"Supported providers: 'openai', 'ollama'"
         )
-
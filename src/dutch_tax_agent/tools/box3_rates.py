@@ -0,0 +1,28 @@
+"""Loader for the Box 3 rates and tax credit parameters."""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from dutch_tax_agent.config import settings
+
+_RATES_FILENAME = "box3_rates_2022_2025.json"
+
+
+@lru_cache(maxsize=4)
+def _read_rates_file(path: Path) -> dict:
+    """Read and parse a rates file (cached per path)."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_all_rates() -> dict:
+    """Load the rates for all supported tax years, keyed by year string.
+
+    The file is parsed once per data directory and shared between the Box 3
+    nodes and tax credit tools, so callers must not modify the returned dict.
+
+    Returns:
+        Dict mapping tax year (e.g. "2024") to that year's rates
+    """
+    return _read_rates_file(settings.data_dir / _RATES_FILENAME)
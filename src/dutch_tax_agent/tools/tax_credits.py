@@ -1,10 +1,9 @@
 """Tax credit calculation tools."""
 
-import json
 import logging
 from math import floor
 
-from dutch_tax_agent.config import settings
+from dutch_tax_agent.tools.box3_rates import load_all_rates
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +17,7 @@ def get_general_tax_credit(
     
     Formula is income-dependent.
     """
-    rates_path = settings.data_dir / "box3_rates_2022_2025.json"
-    with open(rates_path, "r") as f:
-        all_rates = json.load(f)
+    all_rates = load_all_rates()
         
     if str(tax_year) not in all_rates:
         raise ValueError(f"No rates for {tax_year}")
@@ -0,0 +1,103 @@
+"""Unit tests for shared parser agent helpers."""
+
+import re
+
+from dutch_tax_agent.graph.agents._agent_utils import (
+    _error_result,
+    build_messages,
+    compress_doc_text,
+    parse_json_response,
+    select_pages,
+)
+
+
+def test_compress_doc_text_drops_blank_and_page_number_lines():
+    """Blank lines and standalone page numbers are removed."""
+    text = "Account Summary\n\n   \nPage 1 of 2\nCash: 1,000.00\nPagina 2 van 2\n"
+
+    assert compress_doc_text(text) == "Account Summary\nCash: 1,000.00"
+
+
+def test_compress_doc_text_keeps_boilerplate_once_and_short_repeats():
+    """Repeated headers are kept once, short repeated data lines are preserved."""
+    header = "Interactive Brokers LLC - Activity Statement"
+    text = "\n".join([header, "IBAN", "100,00", header, "IBAN", "100,00", header, "IBAN"])
+
+    result = compress_doc_text(text).splitlines()
+
+    assert result.count(header) == 1
+    assert result.count("IBAN") == 3
+    assert result.count("100,00") == 2
+
+
+def test_compress_doc_text_caps_length_with_head_and_tail():
+    """Oversized text keeps the beginning and the end."""
+    text = "\n".join(f"line {i:05d}" for i in range(5000))
+
+    result = compress_doc_text(text, max_chars=300)
+
+    assert result.startswith("line 00000")
+    assert result.endswith("line 04999")
+    assert len(result) <= 300 + len("\n[...]\n")
+
+
+def test_error_result_shape():
+    """Error results carry a single error entry with the stringified error."""
+    result = _error_result("doc-1", "statement.pdf", ValueError("boom"))
+
+    assert result == {
+        "extraction_results": [
+            {
+                "doc_id": "doc-1",
+                "source_filename": "statement.pdf",
+                "status": "error",
+                "extracted_data": {},
+                "errors": ["boom"],
+                "warnings": [],
+            }
+        ]
+    }
+
+
+def test_build_messages_keeps_static_prefix_first():
+    """The static prompt is the system message and the document comes last."""
+    messages = build_messages("Extract Box 3 data.", "Cash: 1,000.00")
+
+    assert [message.type for message in messages] == ["system", "human"]
+    assert messages[0].content == "Extract Box 3 data."
+    assert messages[1].content == "Document:\nCash: 1,000.00"
+
+
+def test_parse_json_response_strips_fences_and_prose():
+    """JSON wrapped in a markdown fence with surrounding prose is still parsed."""
+    response_text = 'Here is the data:\n```json\n{"box3_items": []}\n```\nDone.'
+
+    assert parse_json_response(response_text) == {"box3_items": []}
+
+
+def test_select_pages_keeps_first_and_matching_pages():
+    """Transaction-only pages are dropped, the header and summary pages are kept."""
+    header = "Account statement\n" + "x" * 300
+    summary = "Account Summary\nEnding Balance 12/31/2024: 1,000.00\n" + "y" * 300
+    history = "Trade history\n" + "z" * 300
+    text = "\f".join([header, history, summary, history])
+
+    result = select_pages(text, re.compile(r"ending balance", re.IGNORECASE))
+
+    assert "Account statement" in result
+    assert "Account Summary" in result
+    assert "Trade history" not in result
+
+
+def test_select_pages_falls_back_to_full_text_when_selection_is_small():
+    """A selection below the minimum size returns the original text."""
+    text = "Header\fEnding Balance 100\fTrade history"
+
+    assert select_pages(text, re.compile(r"ending balance", re.IGNORECASE)) == text
+
+
+def test_parse_json_response_bare_json():
+    """Bare JSON from JSON mode is decoded directly."""
+    assert parse_json_response('{"box1_items": [{"gross_amount_eur": 1.5}]}') == {
+        "box1_items": [{"gross_amount_eur": 1.5}]
+    }
@@ -0,0 +1,307 @@
+"""Unit tests for the extraction aggregation node."""
+
+from datetime import date
+
+from dutch_tax_agent.config import settings
+from dutch_tax_agent.graph.nodes.aggregator import _as_date, aggregate_extraction_node
+from dutch_tax_agent.schemas.documents import ExtractionResult, ScrubbedDocument
+from dutch_tax_agent.schemas.state import TaxGraphState
+from dutch_tax_agent.schemas.tax_entities import Box3Asset
+
+
+def _document(doc_id: str) -> ScrubbedDocument:
+    return ScrubbedDocument(
+        doc_id=doc_id,
+        filename=f"{doc_id}.pdf",
+        scrubbed_text="text",
+        page_count=1,
+        char_count=4,
+    )
+
+
+def _extraction(doc_id: str, start: str, end: str, box3_items: list[dict]) -> ExtractionResult:
+    return ExtractionResult(
+        doc_id=doc_id,
+        source_filename=f"{doc_id}.pdf",
+        status="success",
+        extracted_data={
+            "document_date_range": {"start_date": start, "end_date": end},
+            "box3_items": box3_items,
+        },
+    )
+
+
+def _asset(doc_id: str, **fields) -> dict:
+    asset = {
+        "source_doc_id": doc_id,
+        "source_filename": f"{doc_id}.pdf",
+        "asset_type": "stocks",
+        "value_eur_jan1": 0.0,
+        "reference_date": date(2024, 1, 1),
+        "description": "Brokerage",
+        "account_number": "872",
+    }
+    asset.update(fields)
+    return asset
+
+
+def _state(extractions: list[ExtractionResult], validated: list[dict]) -> TaxGraphState:
+    return TaxGraphState(
+        documents=[_document(e.doc_id) for e in extractions],
+        extraction_results=extractions,
+        validated_results=validated,
+        tax_year=2024,
+    )
+
+
+def test_single_asset_with_both_values_is_kept():
+    state = _state(
+        [_extraction("doc-1", "2024-01-01", "2024-12-31", [
+            {"account_number": "872", "asset_type": "stocks",
+             "value_eur_jan1": 100.0, "value_eur_dec31": 150.0},
+        ])],
+        [{"doc_id": "doc-1", "validated_box3_items": [
+            _asset("doc-1", value_eur_jan1=100.0, value_eur_dec31=150.0),
+        ]}],
+    )
+
+    result = aggregate_extraction_node(state)
+
+    assert len(result["box3_asset_items"]) == 1
+    asset = result["box3_asset_items"][0]
+    assert asset.value_eur_jan1 == 100.0
+    assert asset.value_eur_dec31 == 150.0
+    assert result["documents"] == []
+
+
+def test_missing_extracted_jan1_is_treated_as_mid_year_opening():
+    state = _state(
+        [_extraction("doc-1", "2024-06-01", "2024-12-31", [
+            {"account_number": "872", "asset_type": "stocks",
+             "value_eur_jan1": None, "value_eur_dec31": 150.0},
+        ])],
+        [{"doc_id": "doc-1", "validated_box3_items": [
+            _asset("doc-1", value_eur_jan1=80.0, value_eur_dec31=150.0),
+        ]}],
+    )
+
+    asset = aggregate_extraction_node(state)["box3_asset_items"][0]
+
+    assert asset.value_eur_jan1 == 0.0
+    assert asset.value_eur_dec31 == 150.0
+
+
+def test_january_and_december_statements_are_merged():
+    state = _state(
+        [
+            _extraction("jan", "2024-01-01", "2024-01-31", [
+                {"account_number": "872", "asset_type": "stocks",
+                 "value_eur_jan1": 100.0, "value_eur_dec31": None},
+            ]),
+            _extraction("dec", "2024-12-01", "2024-12-31", [
+                {"account_number": "872", "asset_type": "stocks",
+                 "value_eur_jan1": None, "value_eur_dec31": 150.0},
+            ]),
+        ],
+        [
+            {"doc_id": "jan", "validated_box3_items": [
+                _asset("jan", value_eur_jan1=100.0, realized_gains_eur=5.0, extraction_confidence=0.9,
+                       deposits_eur=20.0),
+            ]},
+            {"doc_id": "dec", "validated_box3_items": [
+                _asset("dec", value_eur_dec31=150.0, realized_gains_eur=7.0, extraction_confidence=0.7),
+            ]},
+        ],
+    )
+
+    result = aggregate_extraction_node(state)
+
+    assert len(result["box3_asset_items"]) == 1
+    merged = result["box3_asset_items"][0]
+    assert merged.value_eur_jan1 == 100.0
+    assert merged.value_eur_dec31 == 150.0
+    assert merged.realized_gains_eur == 12.0
+    assert merged.extraction_confidence == 0.7
+    assert merged.reference_date == date(2024, 1, 1)
+    assert merged.source_filename == "dec.pdf, jan.pdf"
+    assert merged.source_doc_id == "jan"
+    assert merged.deposits_eur is None
+
+
+def test_accounts_keep_first_seen_order():
+    state = _state(
+        [
+            _extraction("jan", "2024-01-01", "2024-01-31", [
+                {"account_number": "872", "asset_type": "stocks",
+                 "value_eur_jan1": 100.0, "value_eur_dec31": None},
+                {"account_number": "999", "asset_type": "stocks",
+                 "value_eur_jan1": 10.0, "value_eur_dec31": 20.0},
+            ]),
+            _extraction("dec", "2024-12-01", "2024-12-31", [
+                {"account_number": "872", "asset_type": "stocks",
+                 "value_eur_jan1": None, "value_eur_dec31": 150.0},
+            ]),
+        ],
+        [
+            {"doc_id": "jan", "validated_box3_items": [
+                _asset("jan", value_eur_jan1=100.0),
+                _asset("jan", account_number="999", value_eur_jan1=10.0, value_eur_dec31=20.0),
+            ]},
+            {"doc_id": "dec", "validated_box3_items": [
+                _asset("dec", value_eur_dec31=150.0),
+            ]},
+        ],
+    )
+
+    items = aggregate_extraction_node(state)["box3_asset_items"]
+
+    assert [item.account_number for item in items] == ["872", "999"]
+
+
+def test_asset_without_any_extracted_value_is_quarantined():
+    state = _state(
+        [_extraction("doc-1", "2024-03-01", "2024-03-31", [
+            {"account_number": "872", "asset_type": "stocks",
+             "value_eur_jan1": None, "value_eur_dec31": None},
+        ])],
+        [{"doc_id": "doc-1", "validated_box3_items": [_asset("doc-1")]}],
+    )
+
+    result = aggregate_extraction_node(state)
+
+    assert result["box3_asset_items"] == []
+    assert any("missing value for January 1st" in e for e in result["validation_errors"])
+
+
+def test_existing_items_are_merged_but_untouched_accounts_not_returned():
+    state = _state(
+        [_extraction("dec", "2024-12-01", "2024-12-31", [
+            {"account_number": "872", "asset_type": "stocks",
+             "value_eur_jan1": None, "value_eur_dec31": 150.0},
+        ])],
+        [{"doc_id": "dec", "validated_box3_items": [_asset("dec", value_eur_dec31=150.0)]}],
+    )
+    state.box3_asset_items = [
+        Box3Asset(**_asset("jan", value_eur_jan1=100.0, value_eur_dec31=None)),
+        Box3Asset(**_asset("other", account_number="999", value_eur_jan1=5.0, value_eur_dec31=6.0)),
+    ]
+
+    result = aggregate_extraction_node(state)
+
+    assert len(result["box3_asset_items"]) == 1
+    merged = result["box3_asset_items"][0]
+    assert merged.account_number == "872"
+    assert merged.value_eur_jan1 == 100.0
+    assert merged.value_eur_dec31 == 150.0
+
+
+def test_trusting_validated_items_gives_same_result(monkeypatch):
+    def run():
+        state = _state(
+            [_extraction("doc-1", "2024-01-01", "2024-12-31", [
+                {"account_number": "872", "asset_type": "stocks",
+                 "value_eur_jan1": 100.0, "value_eur_dec31": 150.0},
+            ])],
+            [{"doc_id": "doc-1", "validated_box3_items": [
+                _asset("doc-1", value_eur_jan1=100.0, value_eur_dec31=150.0),
+            ]}],
+        )
+        return aggregate_extraction_node(state)["box3_asset_items"]
+
+    validated = run()
+    monkeypatch.setattr(settings, "trust_validated_items", True)
+    constructed = run()
+
+    assert [a.model_dump() for a in constructed] == [a.model_dump() for a in validated]
+
+
+def test_box1_only_batch_returns_no_box3_items():
+    state = TaxGraphState(
+        documents=[_document("payslip")],
+        validated_results=[{"doc_id": "payslip", "validated_box1_items": [{
+            "source_doc_id": "payslip",
+            "source_filename": "payslip.pdf",
+            "income_type": "salary",
+            "gross_amount_eur": 1000.0,
+            "period_start": date(2024, 1, 1),
+            "period_end": date(2024, 1, 31),
+        }]}],
+        box3_asset_items=[Box3Asset(**_asset("old", value_eur_jan1=5.0, value_eur_dec31=6.0))],
+        tax_year=2024,
+    )
+
+    result = aggregate_extraction_node(state)
+
+    assert len(result["box1_income_items"]) == 1
+    assert result["box3_asset_items"] == []
+
+
+def test_only_current_batch_results_are_aggregated():
+    history = {"doc_id": "old", "validated_box3_items": [
+        _asset("old", account_number="999", value_eur_jan1=5.0, value_eur_dec31=6.0),
+    ]}
+    state = _state(
+        [_extraction("doc-1", "2024-01-01", "2024-12-31", [
+            {"account_number": "872", "asset_type": "stocks",
+             "value_eur_jan1": 100.0, "value_eur_dec31": 150.0},
+        ])],
+        [history, {"doc_id": "doc-1", "validated_box3_items": [
+            _asset("doc-1", value_eur_jan1=100.0, value_eur_dec31=150.0),
+        ]}],
+    )
+
+    result = aggregate_extraction_node(state)
+
+    assert [a.source_doc_id for a in result["box3_asset_items"]] == ["doc-1"]
+
+
+def test_previous_december_statement_supplies_jan1_value():
+    state = _state(
+        [
+            _extraction("dec-prev", "2023-11-01", "2023-11-30", [
+                {"account_number": "872", "asset_type": "stocks",
+                 "value_eur_jan1": 90.0, "value_eur_dec31": None},
+            ]),
+            _extraction("dec", "2024-12-01", "2024-12-31", [
+                {"account_number": "872", "asset_type": "stocks",
+                 "value_eur_jan1": None, "value_eur_dec31": 150.0},
+            ]),
+        ],
+        [
+            {"doc_id": "dec-prev", "validated_box3_items": [_asset("dec-prev", value_eur_jan1=90.0)]},
+            {"doc_id": "dec", "validated_box3_items": [_asset("dec", value_eur_dec31=150.0)]},
+        ],
+    )
+
+    merged = aggregate_extraction_node(state)["box3_asset_items"][0]
+
+    assert merged.value_eur_jan1 == 90.0
+    assert merged.value_eur_dec31 == 150.0
+
+
+def test_missing_value_errors_resolved_by_merging_are_dropped():
+    state = _state(
+        [_extraction("doc-1", "2024-01-01", "2024-12-31", [
+            {"account_number": "872", "asset_type": "stocks",
+             "value_eur_jan1": 100.0, "value_eur_dec31": 150.0},
+        ])],
+        [{"doc_id": "doc-1", "validated_box3_items": [
+            _asset("doc-1", value_eur_jan1=100.0, value_eur_dec31=150.0),
+        ], "validation_errors": [
+            "Box3 validation error in doc-1.pdf: 1 validation error for Box3Asset\n"
+            "  Value error, Box3Asset must have at least one of value_eur_jan1 or value_eur_dec31",
+            "Box3 validation error in other.pdf: 1 validation error for Box3Asset\n"
+            "  Value error, Box3Asset must have at least one of value_eur_jan1 or value_eur_dec31",
+        ]}],
+    )
+
+    errors = aggregate_extraction_node(state)["validation_errors"]
+
+    assert len(errors) == 1
+    assert errors[0].startswith("Box3 validation error in other.pdf")
+
+
+def test_iso_date_strings_are_parsed_in_full():
+    assert _as_date("2024-01-01") == date(2024, 1, 1)
+    assert _as_date("2024-01-01T12:30:00") == date(2024, 1, 1)
+    assert _as_date("2024-01-01 trailing") is None
@@ -7,6 +7,7 @@ import pytest
 from dutch_tax_agent.graph.nodes.box3.statutory_calculation import calculate_statutory_tax as calculate_fictional_yield
 from dutch_tax_agent.graph.nodes.box3.actual_return import calculate_actual_return
 from dutch_tax_agent.schemas.tax_entities import Box3Asset
+from dutch_tax_agent.tools.box3_rates import load_all_rates
 
 
 @pytest.fixture
@@ -83,3 +84,11 @@ def test_box3_below_tax_free_allowance():
     assert result.tax_owed == 0.0
 
 
+
+
+def test_rates_file_is_parsed_once():
+    """Repeated rate lookups share one parsed copy of the rates file."""
+    rates = load_all_rates()
+
+    assert "2024" in rates
+    assert load_all_rates() is rates
@@ -68,6 +68,18 @@ def test_create_graph_without_checkpointing():
         settings.enable_checkpointing = original_setting
 
 
+def test_create_graph_without_checkpointing_is_reused():
+    """Test that the graph without checkpointer is compiled once and reused."""
+    original_setting = settings.enable_checkpointing
+    settings.enable_checkpointing = False
+    
+    try:
+        assert create_tax_graph() is create_tax_graph()
+        
+    finally:
+        settings.enable_checkpointing = original_setting
+
+
 def test_aggregator_clears_documents():
     """Test that aggregate_extraction_node clears document text."""
     from dutch_tax_agent.graph.nodes.aggregator import aggregate_extraction_node
@@ -362,6 +374,63 @@ class TestDatabaseConnectionLifecycle:
             settings.checkpoint_db_path = original_db_path
             contexts.clear()
     
+    def test_sqlite_checkpointer_reused_per_db_path(self, tmp_path: Path):
+        """Test that repeated checkpointer creation shares one connection per database."""
+        contexts = get_active_checkpointer_contexts()
+        contexts.clear()
+        
+        # Temporarily override settings
+        original_backend = settings.checkpoint_backend
+        original_enable = settings.enable_checkpointing
+        original_db_path = settings.checkpoint_db_path
+        
+        try:
+            settings.enable_checkpointing = True
+            settings.checkpoint_backend = "sqlite"
+            settings.checkpoint_db_path = tmp_path / "shared.db"
+            
+            first = create_checkpointer()
+            second = create_checkpointer()
+            assert first is second
+            assert len(get_active_checkpointer_contexts()) == 1
+            
+            settings.checkpoint_db_path = tmp_path / "other.db"
+            assert create_checkpointer() is not first
+            
+        finally:
+            # Restore original settings
+            settings.checkpoint_backend = original_backend
+            settings.enable_checkpointing = original_enable
+            settings.checkpoint_db_path = original_db_path
+            contexts.clear()
+    
+    def test_sqlite_checkpointer_uses_wal(self, tmp_path: Path):
+        """Test that the checkpoint connection is tuned for frequent writes."""
+        contexts = get_active_checkpointer_contexts()
+        contexts.clear()
+        
+        # Temporarily override settings
+        original_backend = settings.checkpoint_backend
+        original_enable = settings.enable_checkpointing
+        original_db_path = settings.checkpoint_db_path
+        
+        try:
+            settings.enable_checkpointing = True
+            settings.checkpoint_backend = "sqlite"
+            settings.checkpoint_db_path = tmp_path / "wal.db"
+            
+            checkpointer = create_checkpointer()
+            assert checkpointer.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            # 1 == NORMAL
+            assert checkpointer.conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            
+        finally:
+            # Restore original settings
+            settings.checkpoint_backend = original_backend
+            settings.enable_checkpointing = original_enable
+            settings.checkpoint_db_path = original_db_path
+            contexts.clear()
+    
     def test_memory_backend_no_context_storage(self):
         """Test that MemorySaver backend doesn't store context managers."""
         # Clear any existing contexts
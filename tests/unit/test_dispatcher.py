@@ -0,0 +1,70 @@
+"""Unit tests for concurrent document classification in the dispatcher."""
+
+import threading
+import time
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from dutch_tax_agent.config import settings
+from dutch_tax_agent.graph.nodes.dispatcher import classify_documents
+
+
+class TestClassifyDocuments:
+    """Tests for classify_documents."""
+
+    def test_classifies_each_document_in_order(self):
+        """Concurrent calls return a classification per document, in input order."""
+        def respond(messages):
+            if "IBKR" in messages[0].content:
+                return AIMessage(content="us_broker_statement,0.90,2024,dec_period")
+            return AIMessage(content="dutch_bank_statement,0.95,2024,null")
+
+        llm = RunnableLambda(respond)
+
+        with patch("dutch_tax_agent.graph.nodes.dispatcher.create_llm", return_value=llm):
+            classifications = classify_documents(
+                [("doc-1", "ING statement"), ("doc-2", "IBKR statement")],
+                tax_year=2024,
+            )
+
+        assert [c.doc_id for c in classifications] == ["doc-1", "doc-2"]
+        assert classifications[0].doc_type == "dutch_bank_statement"
+        assert classifications[0].statement_subtype is None
+        assert classifications[1].doc_type == "us_broker_statement"
+        assert classifications[1].statement_subtype == "dec_period"
+
+    def test_empty_input_skips_llm(self):
+        """No documents means no LLM is created."""
+        with patch("dutch_tax_agent.graph.nodes.dispatcher.create_llm") as create_llm:
+            assert classify_documents([]) == []
+
+        create_llm.assert_not_called()
+
+    def test_concurrency_is_capped(self, monkeypatch):
+        """No more than MAX_PARALLEL_DOCS classification requests run at once."""
+        monkeypatch.setattr(settings, "max_parallel_docs", 2)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def respond(messages):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            return AIMessage(content="dutch_bank_statement,0.95,2024,null")
+
+        llm = RunnableLambda(respond)
+
+        with patch("dutch_tax_agent.graph.nodes.dispatcher.create_llm", return_value=llm):
+            classifications = classify_documents(
+                [(f"doc-{i}", "ING statement") for i in range(6)], tax_year=2024
+            )
+
+        assert len(classifications) == 6
+        assert peak <= 2
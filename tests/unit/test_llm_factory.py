@@ -0,0 +1,78 @@
+"""Unit tests for the LLM factory."""
+
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from dutch_tax_agent.config import settings
+from dutch_tax_agent.llm_cache import SQLiteLLMCache
+from dutch_tax_agent.llm_factory import clear_response_cache, create_llm
+
+
+class TestCreateLLM:
+    """Tests for create_llm instance caching."""
+
+    def test_same_configuration_reuses_instance(self):
+        """Repeated calls with the same settings share one client."""
+        with patch.object(settings, "llm_provider", "ollama"):
+            assert create_llm(temperature=0) is create_llm(temperature=0)
+            assert create_llm(temperature=0) is not create_llm(temperature=0.3)
+            assert create_llm(temperature=0) is not create_llm(temperature=0, json_mode=True)
+
+    def test_settings_change_builds_new_instance(self):
+        """Changing the configured model is picked up instead of serving a stale client."""
+        with patch.object(settings, "llm_provider", "ollama"):
+            with patch.object(settings, "llm_model", "llama3.2"):
+                first = create_llm(temperature=0)
+            with patch.object(settings, "llm_model", "qwen2.5"):
+                second = create_llm(temperature=0)
+
+        assert first is not second
+        assert second.model == "qwen2.5"
+
+    def test_model_override(self):
+        """An explicit model (e.g. PARSER_MODEL) takes precedence over LLM_MODEL."""
+        with patch.object(settings, "llm_provider", "ollama"):
+            with patch.object(settings, "llm_model", "llama3.2"):
+                assert create_llm(temperature=0, model="qwen2.5:7b").model == "qwen2.5:7b"
+                assert create_llm(temperature=0, model="").model == "llama3.2"
+
+
+class TestSQLiteLLMCache:
+    """Tests for the persistent LLM response cache."""
+
+    def test_round_trip_and_miss(self, tmp_path):
+        """Stored responses are returned for the same prompt and model only."""
+        cache = SQLiteLLMCache(tmp_path / "llm_cache.db")
+        generations = [ChatGeneration(message=AIMessage(content='{"box3_items": []}'))]
+
+        assert cache.lookup("prompt", "model-a") is None
+        cache.update("prompt", "model-a", generations)
+
+        cached = cache.lookup("prompt", "model-a")
+        assert [generation.text for generation in cached] == ['{"box3_items": []}']
+        assert cache.lookup("prompt", "model-b") is None
+
+        cache.clear()
+        assert cache.lookup("prompt", "model-a") is None
+
+    def test_cache_is_opt_in(self):
+        """Without ENABLE_LLM_CACHE, use_cache=True does not attach the disk cache."""
+        assert type(settings).model_fields["enable_llm_cache"].default is False
+        with patch.object(settings, "llm_provider", "ollama"):
+            with patch.object(settings, "enable_llm_cache", False):
+                assert create_llm(temperature=0, use_cache=True).cache is None
+
+    def test_clear_response_cache(self, tmp_path):
+        """Clearing empties an existing database and does not create a missing one."""
+        database_path = tmp_path / "llm_cache.db"
+        with patch.object(settings, "llm_cache_db_path", database_path):
+            clear_response_cache()
+            assert not database_path.exists()
+
+            cache = SQLiteLLMCache(database_path)
+            cache.update("prompt", "model-a", [ChatGeneration(message=AIMessage(content="{}"))])
+            clear_response_cache()
+
+        assert cache.lookup("prompt", "model-a") is None
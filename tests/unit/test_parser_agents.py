@@ -0,0 +1,107 @@
+"""Unit tests for the sync and async parser agent entry points."""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from dutch_tax_agent.graph.agents import salary_parser_agent, salary_parser_agent_async
+from dutch_tax_agent.graph.agents.dutch_parser import _process_response as _dutch_process_response
+from dutch_tax_agent.graph.agents.investment_broker_parser import _skip_result as _broker_skip_result
+
+SALARY_RESPONSE = json.dumps(
+    {
+        "document_date_range": {"start_date": "2024-01-01", "end_date": "2024-12-31"},
+        "box1_items": [
+            {
+                "income_type": "salary",
+                "gross_amount_eur": 60000.0,
+                "period_start": "2024-01-01",
+                "period_end": "2024-12-31",
+            }
+        ],
+    }
+)
+
+INPUT_DATA = {
+    "doc_id": "doc-1",
+    "doc_text": "Jaaropgaaf 2024\nBruto salaris: 60.000,00\n" + "Loonheffing ingehouden\n" * 10,
+    "filename": "jaaropgaaf-2024.pdf",
+    "classification": {"tax_year": 2024},
+}
+
+
+class TestSalaryParserAgent:
+    """The sync and async salary parser agents produce the same result."""
+
+    def _llm(self) -> FakeListChatModel:
+        return FakeListChatModel(responses=[SALARY_RESPONSE])
+
+    def test_sync_and_async_agree(self):
+        """Both entry points parse the reply and fill defaults identically."""
+        with patch(
+            "dutch_tax_agent.graph.agents.salary_parser.create_llm", return_value=self._llm()
+        ):
+            sync_result = salary_parser_agent(INPUT_DATA)
+        with patch(
+            "dutch_tax_agent.graph.agents.salary_parser.create_llm", return_value=self._llm()
+        ):
+            async_result = asyncio.run(salary_parser_agent_async(INPUT_DATA))
+
+        assert sync_result == async_result
+        result = sync_result["extraction_results"][0]
+        assert result["status"] == "success"
+        item = result["extracted_data"]["box1_items"][0]
+        assert item["tax_withheld_eur"] == 0.0
+        assert item["original_currency"] == "EUR"
+
+    def test_unparseable_reply_returns_error_result(self):
+        """A reply without valid JSON becomes an error extraction result."""
+        with patch(
+            "dutch_tax_agent.graph.agents.salary_parser.create_llm",
+            return_value=FakeListChatModel(responses=["not json"]),
+        ):
+            result = asyncio.run(salary_parser_agent_async(INPUT_DATA))
+
+        assert result["extraction_results"][0]["status"] == "error"
+
+
+class TestBrokerPreFilter:
+    """Documents the broker parser skips without calling the LLM."""
+
+    def _input(self, doc_text: str) -> dict:
+        return {"doc_id": "doc-2", "doc_text": doc_text, "filename": "statement.pdf"}
+
+    def test_dutch_statement_is_not_skipped(self):
+        """Dutch statements reach the LLM."""
+        doc_text = "Overzicht effectenrekening\nWaarde portefeuille per 31-12-2024\n" * 5
+
+        assert _broker_skip_result(self._input(doc_text)) is None
+
+    def test_unrecognised_document_is_flagged_for_review(self):
+        """Text without any keyword is skipped with a warning, not a plain success."""
+        result = _broker_skip_result(self._input("Lorem ipsum dolor sit amet. " * 10))
+
+        extraction = result["extraction_results"][0]
+        assert extraction["status"] == "partial"
+        assert extraction["extracted_data"]["box3_items"] == []
+        assert extraction["warnings"]
+
+
+def test_dutch_parser_fills_missing_item_fields():
+    """Omitted Box 3 fields get their defaults; the reference date comes from the document."""
+    response = json.dumps({
+        "document_date_range": {"start_date": "2024-03-01", "end_date": "2024-12-31"},
+        "box3_items": [{"asset_type": "savings", "value_eur_jan1": 100.0, "original_currency": "USD"}],
+    })
+
+    result = _dutch_process_response({"doc_id": "doc-3", "filename": "ing.pdf"}, response)
+
+    item = result["extraction_results"][0]["extracted_data"]["box3_items"][0]
+    assert item["reference_date"] == "2024-03-01"
+    assert item["value_eur_jan1"] == 100.0
+    assert item["value_eur_dec31"] is None
+    assert item["original_currency"] == "USD"
+    assert item["extraction_confidence"] == 0.8
+    assert item["account_number"] is None